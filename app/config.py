@@ -1,15 +1,16 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
+import logging
 import os
 from dotenv import load_dotenv
 
-# Load .env file from the backend directory
+logger = logging.getLogger(__name__)
+
+# Load .env file from the backend directory; Settings below also reads
+# .env from the current directory.
 env_path = Path(__file__).parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
-# Also try loading from current directory
-load_dotenv()
-
 
 class Settings(BaseSettings):
     google_safe_browsing_api_key: str | None = None
@@ -23,9 +24,9 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
-# Debug: Print if API key is loaded (only show first few chars for security)
+# Log whether the API key is loaded (only show first few chars for security)
 if settings.google_safe_browsing_api_key:
-    print(f"[OK] Google Safe Browsing API key loaded: {settings.google_safe_browsing_api_key[:10]}...")
+    logger.info("Google Safe Browsing API key loaded: %s...", settings.google_safe_browsing_api_key[:10])
 else:
-    print("[WARNING] Google Safe Browsing API key not found. Set GOOGLE_SAFE_BROWSING_API_KEY in .env file")
+    logger.warning("Google Safe Browsing API key not found. Set GOOGLE_SAFE_BROWSING_API_KEY in .env file")
 
@@ -1,11 +1,22 @@
 import asyncio
-import base64
-from fastapi import FastAPI, File, UploadFile
+import logging
+import os
+import orjson
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Any, Dict, List, Optional
-from app.services.url_scanner_service import scan_url_service
+
+# Configure logging before the app modules are imported so their
+# import-time messages (e.g. app.config) are not dropped.
+logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+from app.services.scan_cache import cached_redirect_chain, cached_scan_url
 from app.services.openphish_service import openphish
+from app.services.http_client import close_client, get_client
+from app.services.tld_utils import warm_up as warm_up_tld
 
 app = FastAPI(
     title="Phishing Detection API",
@@ -21,10 +32,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Screenshot reports carry base64 PNGs and history rows carry full result
+# blobs; both compress well.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson, for large payloads returned without a
+    response_model (those skip FastAPI's Pydantic serialization fast path).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
 
 @app.on_event("startup")
 async def load_feeds():
+    app.state.http = get_client()
+    warm_up_tld()
     await openphish.load_feed()
+    app.state.feed_refresh = asyncio.create_task(openphish.refresh_forever())
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    from app.services.screenshot_service import shutdown_browser
+
+    app.state.feed_refresh.cancel()
+    await close_client()
+    await shutdown_browser()
 
 
 class URLScanRequest(BaseModel):
@@ -49,39 +86,62 @@ async def health_check():
 
 @app.post("/scan/url", response_model=URLScanResponse)
 async def scan_url(payload: URLScanRequest):
-    result = await scan_url_service(payload.url)
+    result = await cached_scan_url(payload.url)
     return result
 
 
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+_UPLOAD_CHUNK = 64 * 1024
+
+
+async def _read_upload_limited(file: UploadFile, request: Request) -> bytes:
+    """
+    Read an upload in chunks, rejecting it with 413 once it exceeds
+    MAX_UPLOAD_BYTES instead of buffering an arbitrarily large body.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Uploaded file is too large")
+
+    data = bytearray()
+    while True:
+        chunk = await file.read(_UPLOAD_CHUNK)
+        if not chunk:
+            break
+        data.extend(chunk)
+        if len(data) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="Uploaded file is too large")
+    return bytes(data)
+
+
 @app.post("/scan/qr")
-async def scan_qr(file: UploadFile = File(...)):
+async def scan_qr(request: Request, file: UploadFile = File(...)):
     """
     Accepts image upload (PNG/JPG), decodes QR, and performs threat analysis.
     Uses the comprehensive QR scanner service.
     """
     from app.services.qr_scanner_service import scan_qr_from_file
     
-    image_bytes = await file.read()
+    image_bytes = await _read_upload_limited(file, request)
     result = await scan_qr_from_file(image_bytes, filename=file.filename)
     
     return result
 
 
-@app.post("/url/screenshot")
+@app.post("/url/screenshot", response_class=ORJSONResponse)
 async def analyze_url_screenshot(request: URLRequestModel):
     """
     Analyze URL and return screenshot and redirect chain.
     """
     try:
         # Import the screenshot service here to avoid issues during startup
-        from app.services.screenshot_service import get_redirect_chain, capture_screenshot
-        
-        # Get redirect chain
-        redirect_chain = await get_redirect_chain(request.url)
+        from app.services.screenshot_service import capture_screenshot_base64
         
-        # Capture screenshot
-        screenshot_bytes = await capture_screenshot(request.url)
-        screenshot_base64 = base64.b64encode(screenshot_bytes).decode('utf-8')
+        # Redirect chain and screenshot are independent; fetch them concurrently
+        redirect_chain, screenshot_base64 = await asyncio.gather(
+            cached_redirect_chain(request.url),
+            capture_screenshot_base64(request.url),
+        )
         
         return {
             "redirect_chain": redirect_chain,
@@ -101,8 +161,16 @@ from app.routers.history import router as history_router
 from app.routers.email_scanner import router as email_scanner_router
 from app.database import engine, Base
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+
+@app.on_event("startup")
+async def create_tables():
+    # Schema is managed by Alembic (`alembic upgrade head`); this shortcut is
+    # only for local development against a throwaway database.
+    if not os.getenv("DEV_AUTO_SCHEMA"):
+        return
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
 
 # Include the routers
 app.include_router(url_scanner_router)
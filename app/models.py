@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -6,10 +7,17 @@ class ScanHistory(Base):
     __tablename__ = "scan_history"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(String, index=True)  # UUID from frontend
+    user_id = Column(String)  # UUID from frontend; indexed via ix_scan_history_user_created
     scan_type = Column(String)  # 'url', 'qr', 'email'
     target = Column(Text)  # The URL or content summary
-    result = Column(JSON)  # Full scan result
+    result = Column(JSON().with_variant(JSONB(), "postgresql"))  # Full scan result; binary JSONB on Postgres
     risk_score = Column(Integer)
     risk_label = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Serves "history for a user, newest first" as a single ordered range scan
+        Index("ix_scan_history_user_created", user_id, created_at.desc()),
+        # Key/containment queries on the result blob (Postgres only)
+        Index("ix_scan_history_result_gin", result, postgresql_using="gin").ddl_if(dialect="postgresql"),
+    )
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from app.database import get_db
 from app.models import ScanHistory
-from app.schemas import ScanHistoryCreate, ScanHistoryResponse
+from app.schemas import ScanHistoryCreate, ScanHistoryResponse, ScanHistorySummary
 
 router = APIRouter(
     prefix="/history",
@@ -11,14 +13,40 @@ router = APIRouter(
 )
 
 @router.post("/", response_model=ScanHistoryResponse)
-def create_scan_history(scan: ScanHistoryCreate, db: Session = Depends(get_db)):
+async def create_scan_history(scan: ScanHistoryCreate, db: AsyncSession = Depends(get_db)):
     db_scan = ScanHistory(**scan.dict())
     db.add(db_scan)
-    db.commit()
-    db.refresh(db_scan)
+    await db.commit()
+    await db.refresh(db_scan)
     return db_scan
 
-@router.get("/{user_id}", response_model=List[ScanHistoryResponse])
-def get_user_history(user_id: str, db: Session = Depends(get_db)):
-    history = db.query(ScanHistory).filter(ScanHistory.user_id == user_id).order_by(ScanHistory.created_at.desc()).all()
-    return history
+@router.get("/{user_id}", response_model=List[ScanHistorySummary])
+async def get_user_history(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[datetime] = Query(None, description="Return scans created before this timestamp (keyset cursor)"),
+    db: AsyncSession = Depends(get_db),
+):
+    # Only the list columns; the full `result` JSON is loaded per scan on demand
+    stmt = select(
+        ScanHistory.id,
+        ScanHistory.scan_type,
+        ScanHistory.target,
+        ScanHistory.risk_score,
+        ScanHistory.risk_label,
+        ScanHistory.created_at,
+    ).where(ScanHistory.user_id == user_id)
+    if before is not None:
+        stmt = stmt.where(ScanHistory.created_at < before)
+    stmt = stmt.order_by(ScanHistory.created_at.desc()).limit(limit)
+    result = await db.execute(stmt)
+    return result.all()
+
+@router.get("/{user_id}/{scan_id}", response_model=ScanHistoryResponse)
+async def get_scan_detail(user_id: str, scan_id: int, db: AsyncSession = Depends(get_db)):
+    stmt = select(ScanHistory).where(ScanHistory.id == scan_id, ScanHistory.user_id == user_id)
+    result = await db.execute(stmt)
+    db_scan = result.scalar_one_or_none()
+    if db_scan is None:
+        raise HTTPException(status_code=404, detail="Scan not found")
+    return db_scan
@@ -1,9 +1,8 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
-from app.services.url_scanner_service import scan_url_service
-from app.services.redirect_chain_service import get_redirect_chain
-from app.services.screenshot_service import capture_screenshot
-import base64
+from app.services.scan_cache import cached_redirect_chain, cached_scan_url
+from app.services.screenshot_service import capture_screenshot_base64
+import asyncio
 
 router = APIRouter()
 
@@ -15,6 +14,17 @@ class URLReportResponse(BaseModel):
     redirect_chain: dict
     screenshot: str
 
+async def _screenshot_data_uri(url: str) -> str:
+    """
+    Capture and encode the screenshot; failures become an inline error string
+    so they don't abort the rest of the report.
+    """
+    try:
+        screenshot_base64 = await capture_screenshot_base64(url)
+        return f"data:image/png;base64,{screenshot_base64}"
+    except Exception as e:
+        return f"{{\"error\": \"Could not capture screenshot: {str(e)}\"}}"
+
 @router.post("/api/url/report", response_model=URLReportResponse)
 async def generate_url_report(payload: URLRequestModel):
     """
@@ -23,19 +33,12 @@ async def generate_url_report(payload: URLRequestModel):
     - Redirect chain analysis
     - Screenshot capture
     """
-    # Get the standard scan result
-    scan_result = await scan_url_service(payload.url)
-    
-    # Get redirect chain
-    redirect_chain = await get_redirect_chain(payload.url)
-    
-    # Capture screenshot
-    try:
-        screenshot_bytes = await capture_screenshot(payload.url)
-        screenshot_base64 = base64.b64encode(screenshot_bytes).decode('utf-8')
-        screenshot_data = f"data:image/png;base64,{screenshot_base64}"
-    except Exception as e:
-        screenshot_data = f"{{\"error\": \"Could not capture screenshot: {str(e)}\"}}"
+    # The three lookups are independent, so run them concurrently
+    scan_result, redirect_chain, screenshot_data = await asyncio.gather(
+        cached_scan_url(payload.url),
+        cached_redirect_chain(payload.url),
+        _screenshot_data_uri(payload.url),
+    )
     
     return {
         "scan_result": scan_result,
@@ -19,3 +19,15 @@ class ScanHistoryResponse(ScanHistoryBase):
 
     class Config:
         orm_mode = True
+
+class ScanHistorySummary(BaseModel):
+    """List-view row: everything except the full `result` payload."""
+    id: int
+    scan_type: str
+    target: str
+    risk_score: int
+    risk_label: str
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
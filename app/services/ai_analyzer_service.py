@@ -1,12 +1,16 @@
 # backend/app/services/ai_analyzer_service.py
 
 import re
-import difflib
 import math
-import json
 import asyncio
-from typing import Optional, Dict, Any, List
-import tldextract
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import urlsplit, urlunsplit
+import orjson
+from rapidfuzz import fuzz, process
+
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.tld_utils import extract as extract_tld
 
 # Optional: import httpx for LLM call if you want to call Cursor/OpenAI
 # import httpx
@@ -22,7 +26,15 @@ PHISHING_KEYWORDS = [
     "confirm", "signin", "reset", "urgent", "limited", "verify-account"
 ]
 
-SUSPICIOUS_TLDS = {"tk", "ml", "xyz", "zip", "top", "click", "cf"}
+BRAND_KEYWORDS_SET = frozenset(BRAND_KEYWORDS)
+
+SUSPICIOUS_TLDS = frozenset({"tk", "ml", "xyz", "zip", "top", "click", "cf"})
+
+_TOKEN_RE = re.compile(r"[\W_]+")
+_PASSWORD_INPUT_RE = re.compile(r'<input[^>]+type=["\']?password', re.I)
+_FORM_ACTION_RE = re.compile(r'<form[^>]+action=["\']([^"\']+)["\']', re.I)
+
+KEYWORD_MATCHER = KeywordMatcher({"phishing": PHISHING_KEYWORDS, "brand": BRAND_KEYWORDS})
 
 LLM_SYSTEM_PROMPT = (
     "You are a concise security assistant. Always output valid JSON only, no commentary."
@@ -37,13 +49,7 @@ def fuzzy_contains_brand(domain: str, brand: str) -> float:
     """
     Return similarity ratio between domain and brand. Higher => more likely lookalike.
     """
-    return difflib.SequenceMatcher(a=domain, b=brand).ratio()
-
-
-def jaccard(a: set, b: set) -> float:
-    if not a and not b:
-        return 0.0
-    return len(a & b) / len(a | b)
+    return fuzz.ratio(domain, brand) / 100.0
 
 
 async def call_llm(system_prompt: str, user_prompt: str) -> Optional[Dict[str, Any]]:
@@ -56,14 +62,50 @@ async def call_llm(system_prompt: str, user_prompt: str) -> Optional[Dict[str, A
     return None
 
 
+def _normalize_cache_url(url: str) -> str:
+    """
+    Lowercase the scheme and host so equivalent URLs share a cache entry.
+    """
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    return urlunsplit(parts._replace(scheme=parts.scheme.lower(), netloc=parts.netloc.lower()))
+
+
+@lru_cache(maxsize=10_000)
+def _heuristic_analysis_cached(url: str) -> Tuple[int, Tuple[str, ...], str]:
+    """
+    URL-only heuristics are deterministic, so results are memoized per URL.
+    Returns an immutable (score, reasons, domain) tuple.
+    """
+    score, reasons, domain = _run_heuristics(url, None)
+    return score, tuple(reasons), domain
+
+
 def heuristic_analysis(url: str, html: Optional[str] = None) -> Dict[str, Any]:
     """
     Run deterministic heuristics and produce a score (0..100) and reasons.
     """
+    if html:
+        score, reasons, domain = _run_heuristics(url, html)
+    else:
+        score, cached_reasons, domain = _heuristic_analysis_cached(_normalize_cache_url(url))
+        reasons = list(cached_reasons)
+
+    return {
+        "source": "heuristic",
+        "score": score,
+        "reasons": reasons,
+        "domain": domain
+    }
+
+
+def _run_heuristics(url: str, html: Optional[str]) -> Tuple[int, List[str], str]:
     reasons: List[str] = []
     score = 0
 
-    parsed = tldextract.extract(url)
+    parsed = extract_tld(url)
     domain = f"{parsed.domain}.{parsed.suffix}" if parsed.suffix else parsed.domain
     norm_domain = simple_normalize_domain(domain)
 
@@ -74,7 +116,7 @@ def heuristic_analysis(url: str, html: Optional[str] = None) -> Dict[str, Any]:
 
     # 2) suspicious keywords in hostname/path
     lower = url.lower()
-    if any(k in lower for k in PHISHING_KEYWORDS):
+    if KEYWORD_MATCHER.find(lower)["phishing"]:
         score += 12
         reasons.append("Contains phishing-related keywords")
 
@@ -87,37 +129,47 @@ def heuristic_analysis(url: str, html: Optional[str] = None) -> Dict[str, Any]:
         reasons.append("Contains many hyphens")
 
     # 4) repeated brand-like tokens (e.g. paypal.com.security-...)
-    for brand in BRAND_KEYWORDS:
-        if brand in norm_domain and norm_domain != brand:
+    exact_brand_matched = False
+    for brand in KEYWORD_MATCHER.find(norm_domain)["brand"]:
+        if norm_domain != brand:
             # domain contains brand but is not exactly brand -> suspicious
             score += 12
             reasons.append(f"Domain contains brand-like token: {brand}")
+            exact_brand_matched = True
             break
 
     # 5) lookalike detection (fuzzy compare domain tokens to brand)
-    # split domain tokens
-    tokens = re.split(r"[\W_]+", parsed.domain.lower())
+    # a near-miss adds nothing once the brand itself was found above
+    tokens = [] if exact_brand_matched else _TOKEN_RE.split(parsed.domain.lower())
     for token in tokens:
-        for brand in BRAND_KEYWORDS:
-            ratio = fuzzy_contains_brand(token, brand)
-            if 0.7 <= ratio < 1.0 and token != brand:
-                score += 10
-                reasons.append(f"Domain token '{token}' looks like brand '{brand}' (similarity {ratio:.2f})")
-                break
+        if token in BRAND_KEYWORDS_SET:
+            # exact brand token, can't be a lookalike
+            continue
+        # best brand match per token in one C-level call (score is 0..100);
+        # score_cutoff lets rapidfuzz discard brands that can't reach 70 from
+        # their lengths alone, so no separate prefilter is needed here
+        match = process.extractOne(token, BRAND_KEYWORDS, scorer=fuzz.ratio, score_cutoff=70)
+        if match is None:
+            continue
+        brand, similarity, _ = match
+        if similarity < 100 and token != brand:
+            ratio = similarity / 100.0
+            score += 10
+            reasons.append(f"Domain token '{token}' looks like brand '{brand}' (similarity {ratio:.2f})")
 
     # 6) presence of login forms (if html passed)
     if html:
         try:
             # naive detection for <input type="password"> or forms pointing to external hosts
-            if re.search(r'<input[^>]+type=["\']?password', html, flags=re.I):
+            if _PASSWORD_INPUT_RE.search(html):
                 score += 20
                 reasons.append("Contains password input (login form)")
 
             # forms with action pointing to different domain
-            forms = re.findall(r'<form[^>]+action=["\']([^"\']+)["\']', html, flags=re.I)
+            forms = _FORM_ACTION_RE.findall(html)
             for action in forms:
                 # if action exists and domain of action differs from original -> suspicious
-                aex = tldextract.extract(action)
+                aex = extract_tld(action)
                 if aex.domain and aex.domain != parsed.domain:
                     score += 8
                     reasons.append("Form action posts to an external domain")
@@ -133,12 +185,7 @@ def heuristic_analysis(url: str, html: Optional[str] = None) -> Dict[str, Any]:
     if score == 0:
         reasons.append("No obvious phishing indicators found by heuristics")
 
-    return {
-        "source": "heuristic",
-        "score": score,
-        "reasons": reasons,
-        "domain": domain
-    }
+    return score, reasons, domain
 
 
 async def analyze_url(url: str, html: Optional[str] = None, screenshot_text: Optional[str] = None) -> Dict[str, Any]:
@@ -170,7 +217,7 @@ async def analyze_url(url: str, html: Optional[str] = None, screenshot_text: Opt
         '  "label": "safe"|"suspicious"|"phishing",\n'
         '  "reasons": ["short reason 1", "short reason 2"]\n'
         "}\n\n"
-        f"Input:\n\nURL: {url}\n\nHeuristics: {json.dumps(heur)}\n\n"
+        f"Input:\n\nURL: {url}\n\nHeuristics: {orjson.dumps(heur).decode()}\n\n"
         f"HTML snippet available: {bool(html)}\n\n"
         f"Screenshot text available: {bool(screenshot_text)}\n\n"
         f"Additional notes: {notes_text}\n\n"
@@ -23,7 +23,8 @@ from __future__ import annotations
 import re
 from typing import Dict, List, Optional
 
-import tldextract
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.tld_utils import extract as extract_tld
 
 
 URGENCY_KEYWORDS = [
@@ -108,14 +109,21 @@ BRAND_KEYWORDS = [
     "instagram",
 ]
 
+# Very simple URL / domain-like pattern
+_DOMAIN_RE = re.compile(r"\b(?:https?://)?([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\b")
+_LONG_NUMBER_RE = re.compile(r"[0-9]{6,}")
 
-def _contains_any(text: str, phrases: List[str]) -> List[str]:
-    text_lower = text.lower()
-    found = []
-    for phrase in phrases:
-        if phrase.lower() in text_lower:
-            found.append(phrase)
-    return found
+# One automaton over every phrase list; scanned once per email.
+PHRASE_MATCHER = KeywordMatcher(
+    {
+        "urgency": URGENCY_KEYWORDS,
+        "login": FAKE_LOGIN_PHRASES,
+        "bank": BANK_FRAUD_PHRASES,
+        "credentials": CREDENTIAL_HARVESTING_PATTERNS,
+        "attachment": ATTACHMENT_KEYWORDS,
+        "signature": FAKE_SIGNATURE_PHRASES,
+    }
+)
 
 
 def _extract_domains_from_text(text: str) -> List[str]:
@@ -123,8 +131,7 @@ def _extract_domains_from_text(text: str) -> List[str]:
     Extract domain-like tokens from arbitrary text (e.g., in signatures).
     """
     candidates = set()
-    # Very simple URL / domain-like pattern
-    for match in re.findall(r"\b(?:https?://)?([a-zA-Z0-9.-]+\.[a-zA-Z]{2,})\b", text):
+    for match in _DOMAIN_RE.findall(text):
         candidates.add(match.lower())
     return list(candidates)
 
@@ -133,8 +140,8 @@ def _detect_lookalike_domains(text: str) -> List[str]:
     domains = _extract_domains_from_text(text)
     lookalikes = []
     for dom in domains:
-        parsed = tldextract.extract(dom)
-        base = parsed.domain.lower()
+        parsed = extract_tld(dom)
+        base = parsed.domain  # candidates are already lowercased
         for brand in BRAND_KEYWORDS:
             if brand in base and base != brand:
                 lookalikes.append(dom)
@@ -153,10 +160,12 @@ def analyze_email_text(
     score = 0
     indicators: List[str] = []
 
+    # Lowercased once; every check below works on this copy.
     combined = f"{subject}\n{body}".lower()
+    found = PHRASE_MATCHER.find(combined)
 
     # 1. Urgency
-    found_urgency = _contains_any(combined, URGENCY_KEYWORDS)
+    found_urgency = found["urgency"]
     if found_urgency:
         score += 20
         indicators.append(
@@ -164,7 +173,7 @@ def analyze_email_text(
         )
 
     # 2. Fake login / account verification
-    found_login = _contains_any(combined, FAKE_LOGIN_PHRASES)
+    found_login = found["login"]
     if found_login:
         score += 20
         indicators.append(
@@ -172,7 +181,7 @@ def analyze_email_text(
         )
 
     # 3. Banking / payment fraud phrases
-    found_bank = _contains_any(combined, BANK_FRAUD_PHRASES)
+    found_bank = found["bank"]
     if found_bank:
         score += 15
         indicators.append(
@@ -180,7 +189,7 @@ def analyze_email_text(
         )
 
     # 4. Credential harvesting
-    found_creds = _contains_any(combined, CREDENTIAL_HARVESTING_PATTERNS)
+    found_creds = found["credentials"]
     if found_creds:
         score += 15
         indicators.append(
@@ -188,7 +197,7 @@ def analyze_email_text(
         )
 
     # 5. Suspicious attachment mentions
-    found_attach = _contains_any(combined, ATTACHMENT_KEYWORDS)
+    found_attach = found["attachment"]
     if found_attach:
         score += 10
         indicators.append(
@@ -196,7 +205,7 @@ def analyze_email_text(
         )
 
     # 6. Generic / fake signatures
-    if _contains_any(combined, FAKE_SIGNATURE_PHRASES):
+    if found["signature"]:
         score += 5
         indicators.append("Generic security/compliance team signature language detected.")
 
@@ -210,7 +219,7 @@ def analyze_email_text(
 
     # 8. Sender/display-name anomalies (very lightweight)
     if sender:
-        if re.search(r"[0-9]{6,}", sender):
+        if _LONG_NUMBER_RE.search(sender):
             score += 5
             indicators.append("Sender address/display name contains long numeric patterns.")
 
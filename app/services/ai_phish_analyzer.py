@@ -6,15 +6,30 @@ It includes fuzzy domain detection, text-based phishing indicators, and HTML/DOM
 """
 
 import re
-from difflib import SequenceMatcher
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
 from urllib.parse import urlparse
 
+from rapidfuzz import fuzz, process
+
 try:
     from bs4 import BeautifulSoup
 except ImportError:
     BeautifulSoup = None
 
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+try:
+    import lxml  # noqa: F401  (only needed as a BeautifulSoup tree builder)
+    BS_PARSER = "lxml"
+except ImportError:
+    BS_PARSER = "html.parser"
+
+from app.services.keyword_matcher import KeywordMatcher
+
 
 # Known brand domains for lookalike detection
 KNOWN_BRANDS = [
@@ -59,8 +74,37 @@ SUSPICIOUS_CTA = [
     "proceed", "continue", "submit", "unlock", "restore"
 ]
 
+# HTML event-handler attributes checked for inline script
+EVENT_HANDLERS = frozenset([
+    "onabort", "onafterprint", "onanimationend", "onanimationstart", "onbeforeprint",
+    "onbeforeunload", "onblur", "oncanplay", "onchange", "onclick", "oncontextmenu",
+    "oncopy", "oncut", "ondblclick", "ondrag", "ondragend", "ondragenter", "ondragleave",
+    "ondragover", "ondragstart", "ondrop", "onerror", "onfocus", "onfocusin", "onfocusout",
+    "onhashchange", "oninput", "oninvalid", "onkeydown", "onkeypress", "onkeyup", "onload",
+    "onloadeddata", "onloadstart", "onmessage", "onmousedown", "onmouseenter",
+    "onmouseleave", "onmousemove", "onmouseout", "onmouseover", "onmouseup", "onpageshow",
+    "onpagehide", "onpaste", "onplay", "onpointerdown", "onpointerup", "onpopstate",
+    "onreset", "onresize", "onscroll", "onsearch", "onselect", "onstorage", "onsubmit",
+    "ontoggle", "ontouchend", "ontouchstart", "ontransitionend", "onunload", "onwheel",
+])
+
+# Subset of PHISHING_KEYWORDS scored as urgency
+URGENCY_KEYWORDS = frozenset(["urgent", "immediate", "act now", "limited time", "expires soon"])
 
-def analyze_text(text: str) -> Dict:
+# One automaton for all text categories, so the text is scanned once
+TEXT_MATCHER = KeywordMatcher({
+    "phishing": PHISHING_KEYWORDS,
+    "cta": SUSPICIOUS_CTA,
+    "form": SUSPICIOUS_FORM_FIELDS,
+})
+
+# Regex text extraction, used only when no HTML parser is installed
+SCRIPT_STYLE_RE = re.compile(r'<(script|style)[^>]*>.*?</\1>', re.DOTALL | re.IGNORECASE)
+TAG_RE = re.compile(r'<[^>]+>')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def analyze_text(text: str) -> Dict[str, Any]:
     """
     Analyze text content for phishing indicators.
     
@@ -78,63 +122,63 @@ def analyze_text(text: str) -> Dict:
         Dictionary with ai_score (0-100) and indicators list
     """
     score = 0
-    indicators = []
+    indicators: List[str] = []
     
     text_lower = text.lower()
+    found = TEXT_MATCHER.find(text_lower)
     
     # Check for urgency/phishing keywords
     urgency_count = 0
     phishing_keyword_count = 0
     
-    for keyword in PHISHING_KEYWORDS:
-        if keyword in text_lower:
-            if keyword in ["urgent", "immediate", "act now", "limited time", "expires soon"]:
-                urgency_count += 1
-                if urgency_count <= 3:  # Cap at 3 to prevent score inflation
-                    score += 10
-                    indicators.append(f"Urgency keyword detected: '{keyword}'")
-            else:
-                phishing_keyword_count += 1
-                if phishing_keyword_count <= 6:  # Cap at 6 to prevent score inflation
-                    score += 5
-                    indicators.append(f"Phishing keyword detected: '{keyword}'")
+    for keyword in found["phishing"]:
+        if keyword in URGENCY_KEYWORDS:
+            urgency_count += 1
+            if urgency_count <= 3:  # Cap at 3 to prevent score inflation
+                score += 10
+                indicators.append(f"Urgency keyword detected: '{keyword}'")
+        else:
+            phishing_keyword_count += 1
+            if phishing_keyword_count <= 6:  # Cap at 6 to prevent score inflation
+                score += 5
+                indicators.append(f"Phishing keyword detected: '{keyword}'")
+        if urgency_count >= 3 and phishing_keyword_count >= 6:
+            break  # both caps reached, nothing more can be added
     
     # Check for suspicious CTAs
     cta_count = 0
-    for cta in SUSPICIOUS_CTA:
-        if cta in text_lower:
-            cta_count += 1
-            if cta_count <= 2:  # Cap at 2 to prevent score inflation
-                score += 10
-                indicators.append(f"Suspicious CTA detected: '{cta}'")
+    for cta in found["cta"]:
+        cta_count += 1
+        if cta_count <= 2:  # Cap at 2 to prevent score inflation
+            score += 10
+            indicators.append(f"Suspicious CTA detected: '{cta}'")
+        if cta_count >= 2:
+            break
     
     # Check for suspicious form references
     form_count = 0
-    for field in SUSPICIOUS_FORM_FIELDS:
-        if field in text_lower:
-            form_count += 1
-            if form_count <= 2:  # Cap at 2 to prevent score inflation
-                score += 15
-                indicators.append(f"Suspicious form field reference: '{field}'")
-    
-    # Check for brand misspellings
-    brand_misspellings = []
+    for field in found["form"]:
+        form_count += 1
+        if form_count <= 2:  # Cap at 2 to prevent score inflation
+            score += 15
+            indicators.append(f"Suspicious form field reference: '{field}'")
+        if form_count >= 2:
+            break
+    
+    # Check for brand misspellings: substituted variants present in the text
+    # while the real brand name is not
+    variant_hits = BRAND_VARIANT_MATCHER.find(text_lower)
+    brand_misspellings: Dict[str, None] = {}  # ordered, deduplicated
     for brand in KNOWN_BRANDS:
-        # Check direct misspellings with substitutions
-        if is_lookalike(brand, [brand], CHAR_SUBSTITUTIONS):
-            # Look for substituted versions in text
-            for char, subs in CHAR_SUBSTITUTIONS.items():
-                if char in brand:
-                    for sub in subs:
-                        substituted_brand = brand.replace(char, sub)
-                        if substituted_brand in text_lower and brand not in text_lower:
-                            brand_misspellings.append(substituted_brand)
+        if variant_hits[brand] and brand not in text_lower:
+            brand_misspellings.update(dict.fromkeys(variant_hits[brand]))
+            if len(brand_misspellings) >= 2:  # Cap at 2 to prevent score inflation
+                break
                             
     # Score brand misspellings (max 40 points)
-    for i, misspelled in enumerate(set(brand_misspellings)):  # Use set to deduplicate
-        if i < 2:  # Cap at 2 to prevent score inflation
-            score += 20
-            indicators.append(f"Potential brand misspelling: '{misspelled}'")
+    for misspelled in list(brand_misspellings)[:2]:
+        score += 20
+        indicators.append(f"Potential brand misspelling: '{misspelled}'")
     
     return {
         "ai_score": min(score, 100),
@@ -142,7 +186,7 @@ def analyze_text(text: str) -> Dict:
     }
 
 
-def is_lookalike(domain: str, known_brand_list: List[str], substitutions: Dict[str, List[str]] = None) -> bool:
+def is_lookalike(domain: str, known_brand_list: List[str], substitutions: Optional[Dict[str, List[str]]] = None) -> bool:
     """
     Detect if a domain is a lookalike of known brands using character substitution and similarity.
     
@@ -164,23 +208,44 @@ def is_lookalike(domain: str, known_brand_list: List[str], substitutions: Dict[s
         if domain_lower == brand:
             return False  # Not a lookalike if it's the actual brand
             
-    # Similarity check using SequenceMatcher
-    for brand in known_brand_list:
-        similarity = SequenceMatcher(None, domain_lower, brand).ratio()
-        if similarity >= 0.8:  # High similarity threshold
-            return True
+    # Similarity check (high similarity threshold); one C-level call over all brands
+    if process.extractOne(domain_lower, known_brand_list, scorer=fuzz.ratio, score_cutoff=80) is not None:
+        return True
             
-    # Character substitution check
+    # Character substitution check: one character-class pattern per brand
+    # instead of enumerating every substituted variation
     for brand in known_brand_list:
-        # Create variations of the brand with substitutions
-        variations = _generate_variations(brand, substitutions)
-        if domain_lower in variations:
+        if substitutions is CHAR_SUBSTITUTIONS:
+            pattern = _default_substitution_pattern(brand)
+        else:
+            pattern = _substitution_pattern(brand, substitutions)
+        if pattern.fullmatch(domain_lower):
             return True
             
     return False
 
 
-def _generate_variations(base_word: str, substitutions: Dict[str, List[str]]) -> set:
+def _substitution_pattern(brand: str, substitutions: Dict[str, List[str]]) -> re.Pattern:
+    """
+    Compile a pattern matching brand with any character swapped for one of
+    its substitutes, e.g. 'paypal' -> 'p[a@]yp[a@][l1i]'.
+    """
+    parts = []
+    for char in brand.lower():
+        options = dict.fromkeys([char, *substitutions.get(char, ())])
+        if len(options) == 1:
+            parts.append(re.escape(char))
+        else:
+            parts.append('[' + ''.join(re.escape(c) for c in options) + ']')
+    return re.compile(''.join(parts))
+
+
+@lru_cache(maxsize=256)
+def _default_substitution_pattern(brand: str) -> re.Pattern:
+    return _substitution_pattern(brand, CHAR_SUBSTITUTIONS)
+
+
+def _generate_variations(base_word: str, substitutions: Dict[str, List[str]]) -> Set[str]:
     """
     Generate possible variations of a word using character substitutions.
     
@@ -191,13 +256,13 @@ def _generate_variations(base_word: str, substitutions: Dict[str, List[str]]) ->
     Returns:
         Set of possible variations
     """
-    variations = {base_word.lower()}
+    variations: Set[str] = {base_word.lower()}
     
     # For each character that can be substituted
     for char, substitutes in substitutions.items():
         if char in base_word:
             # For each substitute character
-            new_variations = set()
+            new_variations: Set[str] = set()
             for variation in variations:
                 # Replace all instances of the character
                 for sub in substitutes:
@@ -208,7 +273,14 @@ def _generate_variations(base_word: str, substitutions: Dict[str, List[str]]) ->
     return variations
 
 
-def analyze_dom(html: str, base_url: str) -> Dict:
+# Substituted spellings of each brand (the brand itself excluded), built once
+BRAND_VARIANT_MATCHER = KeywordMatcher({
+    brand: sorted(_generate_variations(brand, CHAR_SUBSTITUTIONS) - {brand})
+    for brand in KNOWN_BRANDS
+})
+
+
+def analyze_dom(html: str, base_url: str) -> Dict[str, Any]:
     """
     Analyze HTML/DOM structure for phishing indicators.
     
@@ -231,91 +303,106 @@ def analyze_dom(html: str, base_url: str) -> Dict:
             "ai_score": 0,
             "indicators": ["BeautifulSoup not available for DOM analysis"]
         }
-        
-    score = 0
-    indicators = []
     
     try:
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = BeautifulSoup(html, BS_PARSER)
     except Exception:
         return {
             "ai_score": 0,
             "indicators": ["Failed to parse HTML content"]
         }
     
+    return analyze_dom_from_soup(soup, base_url)
+
+
+def analyze_dom_from_soup(soup: Any, base_url: str) -> Dict[str, Any]:
+    """
+    analyze_dom on an already parsed BeautifulSoup tree (left unmodified).
+    """
+    score = 0
+    indicators: List[str] = []
+    
     # Parse base URL for domain comparison
     try:
         base_domain = urlparse(base_url).netloc.lower()
     except Exception:
         base_domain = ""
     
-    # Check forms
-    forms = soup.find_all('form')
+    # Single walk over every tag; each check collects its indicators
+    # separately so they are reported in the same order as before.
+    form_indicators: List[str] = []
+    iframe_indicators: List[str] = []
+    attr_indicators: List[str] = []
     external_form_count = 0
     password_field_count = 0
+    input_count = 0
+    hidden_iframe_count = 0
+    suspicious_attrs = 0
     
-    for form in forms:
-        # Check form action
-        action = form.get('action', '')
-        if action:
-            try:
-                action_domain = urlparse(action).netloc.lower()
-                # If action points to external domain
-                if action_domain and action_domain != base_domain:
-                    external_form_count += 1
-                    if external_form_count <= 2:  # Cap to prevent score inflation
-                        score += 25
-                        indicators.append(f"Form with external action detected: {action}")
-            except Exception:
-                # Malformed URL, treat as suspicious
-                score += 15
-                indicators.append(f"Form with malformed action URL: {action}")
-                
-        # Check for password fields
-        password_fields = form.find_all('input', {'type': 'password'})
-        password_field_count += len(password_fields)
+    for tag in soup.find_all(True):
+        name = tag.name
+        attrs = tag.attrs
+        
+        if name == 'form':
+            # Check form action
+            action = attrs.get('action', '')
+            if action:
+                try:
+                    action_domain = urlparse(action).netloc.lower()
+                    # If action points to external domain
+                    if action_domain and action_domain != base_domain:
+                        external_form_count += 1
+                        if external_form_count <= 2:  # Cap to prevent score inflation
+                            score += 25
+                            form_indicators.append(f"Form with external action detected: {action}")
+                except Exception:
+                    # Malformed URL, treat as suspicious
+                    score += 15
+                    form_indicators.append(f"Form with malformed action URL: {action}")
         
+        elif name == 'input':
+            input_count += 1
+            # Password fields only count inside a form
+            if attrs.get('type') == 'password' and tag.find_parent('form') is not None:
+                password_field_count += 1
+        
+        elif name == 'iframe':
+            # Check for hidden iframes
+            style = attrs.get('style', '').lower()
+            width = attrs.get('width', '')
+            height = attrs.get('height', '')
+            
+            if ('display:none' in style or 
+                'visibility:hidden' in style or 
+                width == '0' or height == '0' or
+                (width == '' and height == '')):
+                hidden_iframe_count += 1
+                if hidden_iframe_count <= 2:  # Cap to prevent score inflation
+                    score += 20
+                    iframe_indicators.append("Hidden iframe detected")
+        
+        # Check for onload, onerror, etc. event handlers that could be malicious
+        for attr, value in attrs.items():
+            if attr in EVENT_HANDLERS and isinstance(value, str) and 'script' in value.lower():
+                suspicious_attrs += 1
+                if suspicious_attrs <= 2:  # Cap to prevent score inflation
+                    score += 10
+                    attr_indicators.append(f"Suspicious script attribute: {attr}")
+    
+    indicators.extend(form_indicators)
+    
     # Score password fields (max 20 points)
     if password_field_count > 0:
         score += min(password_field_count * 10, 20)
         indicators.append(f"Password fields detected: {password_field_count}")
     
     # Check for many input fields (indicative of data harvesting)
-    all_inputs = soup.find_all('input')
-    if len(all_inputs) > 10:
+    if input_count > 10:
         score += 15
-        indicators.append(f"Excessive input fields detected: {len(all_inputs)}")
-        
-    # Check for invisible iframes
-    iframes = soup.find_all('iframe')
-    hidden_iframe_count = 0
+        indicators.append(f"Excessive input fields detected: {input_count}")
     
-    for iframe in iframes:
-        # Check for hidden iframes
-        style = iframe.get('style', '').lower()
-        width = iframe.get('width', '')
-        height = iframe.get('height', '')
-        
-        if ('display:none' in style or 
-            'visibility:hidden' in style or 
-            width == '0' or height == '0' or
-            (width == '' and height == '')):
-            hidden_iframe_count += 1
-            if hidden_iframe_count <= 2:  # Cap to prevent score inflation
-                score += 20
-                indicators.append("Hidden iframe detected")
-    
-    # Check for suspicious attributes
-    suspicious_attrs = 0
-    for tag in soup.find_all(True):  # Find all tags
-        attrs = tag.attrs
-        # Check for onload, onerror, etc. event handlers that could be malicious
-        for attr in attrs:
-            if attr.startswith('on') and 'script' in str(attrs[attr]).lower():
-                suspicious_attrs += 1
-                if suspicious_attrs <= 2:  # Cap to prevent score inflation
-                    score += 10
-                    indicators.append(f"Suspicious script attribute: {attr}")
+    indicators.extend(iframe_indicators)
+    indicators.extend(attr_indicators)
                     
     return {
         "ai_score": min(score, 100),
@@ -323,7 +410,7 @@ def analyze_dom(html: str, base_url: str) -> Dict:
     }
 
 
-def analyze_page(url: str, html: str) -> Dict:
+def analyze_page(url: str, html: str) -> Dict[str, Any]:
     """
     Combined analysis of text and DOM content for phishing detection.
     
@@ -338,23 +425,34 @@ def analyze_page(url: str, html: str) -> Dict:
     Returns:
         Dictionary with combined ai_score (0-100) and consolidated indicators list
     """
-    # Extract text content for analysis
-    text_content = _extract_text_from_html(html) if html else ""
+    soup = None
+    if html and BeautifulSoup:
+        try:
+            soup = BeautifulSoup(html, BS_PARSER)
+        except Exception:
+            soup = None
+    
+    if soup is not None:
+        # Parse once and share the tree. DOM analysis runs first because
+        # text extraction removes script/style elements from the tree.
+        dom_result = analyze_dom_from_soup(soup, url)
+        text_content = _extract_text_from_soup(soup)
+    else:
+        dom_result = analyze_dom(html, url) if html else {"ai_score": 0, "indicators": []}
+        text_content = _extract_text_from_html(html) if html else ""
     
     # Perform text analysis
     text_result = analyze_text(text_content)
     text_score = text_result["ai_score"]
     
-    # Perform DOM analysis
-    dom_result = analyze_dom(html, url) if html else {"ai_score": 0, "indicators": []}
     dom_score = dom_result["ai_score"]
     
     # Combine scores with weighting
     # Text analysis contributes 40%, DOM analysis contributes 60%
     combined_score = min(int(text_score * 0.4 + dom_score * 0.6), 100)
     
-    # Consolidate indicators
-    all_indicators = list(set(text_result["indicators"] + dom_result["indicators"]))
+    # Consolidate indicators (deduplicated, text first, in detection order)
+    all_indicators = list(dict.fromkeys(text_result["indicators"] + dom_result["indicators"]))
     
     return {
         "ai_score": combined_score,
@@ -372,19 +470,39 @@ def _extract_text_from_html(html: str) -> str:
     Returns:
         Plain text content
     """
+    if HTMLParser:
+        try:
+            tree = HTMLParser(html)
+            # Remove script and style elements
+            for node in tree.css("script, style"):
+                node.decompose()
+            return tree.text(separator=' ', strip=True)
+        except Exception:
+            return ""
+
     if not BeautifulSoup:
-        # Fallback to regex if BeautifulSoup is not available
+        # Fallback to regex if neither HTML parser is available
         # Remove script and style elements
-        html = re.sub(r'<(script|style)[^>]*>.*?</\1>', '', html, flags=re.DOTALL | re.IGNORECASE)
+        html = SCRIPT_STYLE_RE.sub('', html)
         # Remove HTML tags
-        text = re.sub(r'<[^>]+>', ' ', html)
+        text = TAG_RE.sub(' ', html)
         # Clean up whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = WHITESPACE_RE.sub(' ', text).strip()
         return text
     
     try:
-        soup = BeautifulSoup(html, 'html.parser')
-        # Remove script and style elements
+        return _extract_text_from_soup(BeautifulSoup(html, BS_PARSER))
+    except Exception:
+        return ""
+
+
+def _extract_text_from_soup(soup: Any) -> str:
+    """
+    Extract text content from a parsed BeautifulSoup tree.
+    
+    Note: removes script and style elements from the tree.
+    """
+    try:
         for script in soup(["script", "style"]):
             script.decompose()
         return soup.get_text(separator=' ', strip=True)
@@ -393,7 +511,7 @@ def _extract_text_from_html(html: str) -> str:
 
 
 # For backward compatibility with existing code
-def analyze_with_ai(url: str, html: str) -> Dict:
+def analyze_with_ai(url: str, html: str) -> Dict[str, Any]:
     """
     Backward compatible wrapper for analyze_page.
     
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import re
-from difflib import SequenceMatcher
+from functools import lru_cache
 from typing import List
 
-import tldextract
+from rapidfuzz import fuzz, process
+
+from app.services.scan_limits import MAX_SCAN_SIZE
+from app.services.tld_utils import extract as extract_tld
 
 BRAND_LIST = [
     "google",
@@ -46,8 +49,18 @@ FORM_PATTERNS = [
 SUSPICIOUS_TLDS = {"tk", "ml", "ga", "cf", "biz", "xyz", "zip", "top"}
 
 
+def _keyword_regex(keywords: List[str]) -> re.Pattern:
+    return re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)
+
+
+# Case-insensitive, so the page is never copied to lowercase
+LOGIN_RE = _keyword_regex(LOGIN_KEYWORDS)
+BANKING_RE = _keyword_regex(BANKING_KEYWORDS)
+FORM_RE = re.compile("|".join(FORM_PATTERNS), re.IGNORECASE)
+
+
 def _normalize_domain(url: str) -> tuple[str, str, str]:
-    extracted = tldextract.extract(url)
+    extracted = extract_tld(url)
     suffix = extracted.suffix.lower() if extracted.suffix else ""
     domain_label = ".".join(
         part for part in (extracted.domain, extracted.suffix) if part
@@ -56,23 +69,15 @@ def _normalize_domain(url: str) -> tuple[str, str, str]:
     return core_domain, suffix, domain_label or url.lower()
 
 
-def _html_contains_keywords(html_lower: str, keywords: List[str]) -> bool:
-    return any(keyword in html_lower for keyword in keywords)
-
-
+@lru_cache(maxsize=4096)
 def _detect_lookalike(core_domain: str) -> bool:
-    for brand in BRAND_LIST:
-        similarity = SequenceMatcher(a=core_domain, b=brand).ratio()
-        if similarity >= 0.75 and core_domain != brand:
-            return True
-    return False
+    if core_domain in BRAND_LIST:
+        return False
+    return process.extractOne(core_domain, BRAND_LIST, scorer=fuzz.ratio, score_cutoff=75) is not None
 
 
 def _detect_suspicious_forms(html: str) -> bool:
-    for pattern in FORM_PATTERNS:
-        if re.search(pattern, html, flags=re.IGNORECASE):
-            return True
-    return False
+    return FORM_RE.search(html) is not None
 
 
 def analyze_with_ai(url: str, html: str | None) -> dict:
@@ -93,13 +98,13 @@ def analyze_with_ai(url: str, html: str | None) -> dict:
         details.append(f"Suspicious TLD detected: .{suffix}")
 
     if html:
-        lower_html = html.lower()
+        html = html[:MAX_SCAN_SIZE]
 
-        if _html_contains_keywords(lower_html, LOGIN_KEYWORDS):
+        if LOGIN_RE.search(html):
             score += 25
             details.append("Login page detected")
 
-        if _html_contains_keywords(lower_html, BANKING_KEYWORDS):
+        if BANKING_RE.search(html):
             score += 25
             details.append("Banking flow indicators detected")
 
@@ -6,10 +6,12 @@ by analyzing HTML content and domain characteristics.
 """
 
 import re
-import httpx
-from typing import List, Dict
+from typing import List, Dict, Set, Tuple, Union
 from urllib.parse import urlparse, urljoin
-import tldextract
+
+from app.services.http_client import get_client
+from app.services.scan_limits import MAX_SCAN_SIZE
+from app.services.tld_utils import extract as extract_tld
 
 
 # Known popular brands for domain comparison
@@ -34,6 +36,20 @@ URGENT_PHRASES = [
     "unauthorized access", "verify identity", "confirm your identity"
 ]
 
+# Precompiled once; each keyword/phrase list is a single alternation so the
+# HTML is scanned once per category instead of once per entry.
+# Patterns are bytes so the raw response body is scanned without decoding it.
+PASSWORD_INPUT_RE = re.compile(rb'<input[^>]*type\s*=\s*["\']?password["\']?[^>]*>', re.IGNORECASE)
+KEYWORD_RE = re.compile(
+    rb'\b(' + b'|'.join(re.escape(k.encode()) for k in SUSPICIOUS_KEYWORDS) + rb')\b', re.IGNORECASE
+)
+# Lookahead so overlapping phrases ("account suspended" / "suspended") all match
+URGENT_RE = re.compile(
+    b'(?=(' + b'|'.join(re.escape(p.encode()) for p in URGENT_PHRASES) + b'))', re.IGNORECASE
+)
+SCRIPT_SRC_RE = re.compile(rb'<script[^>]*src\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+FORM_ACTION_RE = re.compile(rb'<form[^>]*action\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+
 # Suspicious TLDs
 SUSPICIOUS_TLDS = {".zip", ".xyz", ".top", ".loan", ".click", ".tk", ".ml", ".cf"}
 
@@ -58,31 +74,72 @@ HOMOGLYPHS = {
     'b': '8'
 }
 
+# Canonicalizing table: digit lookalikes -> letters only. The letter -> digit
+# entries above are the reverse direction; applying both (as the old replace
+# chain did) turned every 'o' back into '0' and never produced a stable form.
+HOMOGLYPH_TABLE = str.maketrans({k: v for k, v in HOMOGLYPHS.items() if k.isdigit()})
+
+# Candidate index for lookalike checks: a brand can only be a substring of a
+# label if it shares trigrams with it, and only be a <=2-character
+# substitution of a label of the same length.
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _hamming_le2(a: str, b: str) -> int:
+    """
+    Hamming distance between equal-length strings, stopping at 3 since only
+    distances up to 2 matter.
+    """
+    differences = 0
+    for x, y in zip(a, b):
+        if x != y:
+            differences += 1
+            if differences > 2:
+                return 3
+    return differences
+
+
+def _build_brand_index() -> Tuple[Dict[str, Set[int]], Dict[int, Set[int]]]:
+    trigrams: Dict[str, Set[int]] = {}
+    by_len: Dict[int, Set[int]] = {}
+    for index, brand in enumerate(POPULAR_BRANDS):
+        for gram in _trigrams(brand):
+            trigrams.setdefault(gram, set()).add(index)
+        by_len.setdefault(len(brand), set()).add(index)
+    return trigrams, by_len
+
+
+BRAND_TRIGRAMS, BRAND_INDEXES_BY_LEN = _build_brand_index()
+
 
 def normalize_domain(domain: str) -> str:
     """
     Normalize domain by replacing homoglyphs with common characters.
     This helps detect lookalike domains.
     """
-    normalized = domain.lower()
-    for char, replacement in HOMOGLYPHS.items():
-        normalized = normalized.replace(char, replacement)
-    return normalized
+    # Single pass; each character is mapped at most once
+    return domain.lower().translate(HOMOGLYPH_TABLE)
 
 
 def detect_lookalike_domain(domain: str) -> bool:
     """
     Detect if a domain is a lookalike of a popular brand.
     """
-    domain_lower = domain.lower()
-    normalized_domain = normalize_domain(domain_lower)
+    # Remove TLD for comparison; lowercase and translate only that label.
+    # Brands need no normalization: they contain no digit homoglyphs.
+    domain_without_tld = domain.lower().partition('.')[0]
+    normalized_without_tld = domain_without_tld.translate(HOMOGLYPH_TABLE)
     
-    # Remove TLD for comparison
-    domain_without_tld = domain_lower.split('.')[0] if '.' in domain_lower else domain_lower
-    normalized_without_tld = normalized_domain.split('.')[0] if '.' in normalized_domain else normalized_domain
+    grams = _trigrams(domain_without_tld)
+    if normalized_without_tld != domain_without_tld:
+        grams |= _trigrams(normalized_without_tld)
+    candidates = set(BRAND_INDEXES_BY_LEN.get(len(domain_without_tld), ()))
+    for gram in grams:
+        candidates.update(BRAND_TRIGRAMS.get(gram, ()))
     
-    for brand in POPULAR_BRANDS:
-        brand_lower = brand.lower()
+    for index in sorted(candidates):
+        brand_lower = POPULAR_BRANDS[index]
         
         # Direct substring match
         if brand_lower in domain_without_tld and domain_without_tld != brand_lower:
@@ -91,7 +148,7 @@ def detect_lookalike_domain(domain: str) -> bool:
         # Check for homoglyph variations
         if len(domain_without_tld) == len(brand_lower):
             # Check if it's a close match with character substitutions
-            differences = sum(1 for a, b in zip(domain_without_tld, brand_lower) if a != b)
+            differences = _hamming_le2(domain_without_tld, brand_lower)
             if differences <= 2 and differences > 0:
                 return True
         
@@ -102,66 +159,68 @@ def detect_lookalike_domain(domain: str) -> bool:
     return False
 
 
-def analyze_html_content(html: str, base_url: str) -> Dict:
+def _distinct_hits(pattern: re.Pattern, html: bytes, total: int) -> Set[str]:
     """
-    Analyze HTML content for phishing indicators.
+    Lowercased distinct matches of pattern's group 1, scanning only until
+    all `total` alternatives have been seen.
+    """
+    hits: Set[str] = set()
+    for match in pattern.finditer(html):
+        hits.add(match.group(1).decode().lower())
+        if len(hits) == total:
+            break
+    return hits
+
+
+def analyze_html_content(html: Union[bytes, str], base_url: str) -> Dict:
+    """
+    Analyze HTML content (raw response bytes, or str) for phishing indicators.
     
     Returns:
         dict with detected features and reasons
     """
-    html_lower = html.lower()
+    # Patterns are case-insensitive, so no lowercased copy of the page is made
+    if isinstance(html, str):
+        html = html.encode('utf-8', 'ignore')
+    html = html[:MAX_SCAN_SIZE]
     reasons = []
     score = 0
     
     # 1. Detect login forms (password inputs)
-    password_input_pattern = r'<input[^>]*type\s*=\s*["\']?password["\']?[^>]*>'
-    login_forms = re.findall(password_input_pattern, html, re.IGNORECASE)
-    if login_forms:
+    if PASSWORD_INPUT_RE.search(html):
         score += 25
         reasons.append("Login form detected (password input field)")
     
     # 2. Detect suspicious keywords in HTML content
-    keyword_count = 0
-    found_keywords = []
-    for keyword in SUSPICIOUS_KEYWORDS:
-        # Use word boundaries to avoid partial matches
-        pattern = r'\b' + re.escape(keyword) + r'\b'
-        matches = re.findall(pattern, html_lower)
-        if matches:
-            keyword_count += len(matches)
-            if keyword not in found_keywords:
-                found_keywords.append(keyword)
+    # Word boundaries avoid partial matches; report in list order
+    keyword_hits = _distinct_hits(KEYWORD_RE, html, len(SUSPICIOUS_KEYWORDS))
+    found_keywords = [keyword for keyword in SUSPICIOUS_KEYWORDS if keyword in keyword_hits]
     
-    if keyword_count > 0:
+    if found_keywords:
         score += 10
         reasons.append(f"Suspicious keywords detected: {', '.join(found_keywords[:5])}")
     
     # 3. Detect urgent phrases
-    urgent_count = 0
-    found_phrases = []
-    for phrase in URGENT_PHRASES:
-        pattern = re.escape(phrase)
-        if re.search(pattern, html_lower):
-            urgent_count += 1
-            found_phrases.append(phrase)
+    phrase_hits = _distinct_hits(URGENT_RE, html, len(URGENT_PHRASES))
+    found_phrases = [phrase for phrase in URGENT_PHRASES if phrase in phrase_hits]
     
-    if urgent_count > 0:
+    if found_phrases:
         score += 20
         reasons.append(f"Urgent/suspicious phrases detected: {', '.join(found_phrases[:3])}")
     
     # 4. Detect scripts from unknown domains
-    script_pattern = r'<script[^>]*src\s*=\s*["\']([^"\']+)["\']'
-    scripts = re.findall(script_pattern, html, re.IGNORECASE)
-    
+    # Only the matched URLs are decoded
     try:
         base_domain = urlparse(base_url).netloc
-        base_domain_parts = tldextract.extract(base_domain)
+        base_domain_parts = extract_tld(base_domain)
         base_domain_normalized = f"{base_domain_parts.domain}.{base_domain_parts.suffix}"
     except:
         base_domain_normalized = ""
     
-    unknown_scripts = []
-    for script_url in scripts:
+    # Only 3 domains are reported; stop parsing script URLs once we have them
+    unknown_scripts: Dict[str, None] = {}
+    for match in SCRIPT_SRC_RE.finditer(html):
+        script_url = match.group(1).decode('utf-8', 'ignore')
         try:
             # Handle relative URLs
             if script_url.startswith('//'):
@@ -172,25 +231,24 @@ def analyze_html_content(html: str, base_url: str) -> Dict:
                 script_url = urljoin(base_url, script_url)
             
             script_domain = urlparse(script_url).netloc
-            script_domain_parts = tldextract.extract(script_domain)
+            script_domain_parts = extract_tld(script_domain)
             script_domain_normalized = f"{script_domain_parts.domain}.{script_domain_parts.suffix}"
             
             if script_domain_normalized and script_domain_normalized != base_domain_normalized:
-                unknown_scripts.append(script_domain_normalized)
+                unknown_scripts[script_domain_normalized] = None
+                if len(unknown_scripts) >= 3:
+                    break
         except:
             pass
     
     if unknown_scripts:
-        unique_unknown = list(set(unknown_scripts))[:3]
         score += 10
-        reasons.append(f"Scripts loaded from external domains: {', '.join(unique_unknown)}")
+        reasons.append(f"Scripts loaded from external domains: {', '.join(unknown_scripts)}")
     
     # 5. Detect forms that send POST requests to external URLs
-    form_pattern = r'<form[^>]*action\s*=\s*["\']([^"\']+)["\']'
-    forms = re.findall(form_pattern, html, re.IGNORECASE)
-    
-    external_forms = []
-    for form_action in forms:
+    external_forms: Dict[str, None] = {}
+    for match in FORM_ACTION_RE.finditer(html):
+        form_action = match.group(1).decode('utf-8', 'ignore')
         try:
             # Handle relative URLs
             if form_action.startswith('//'):
@@ -201,18 +259,19 @@ def analyze_html_content(html: str, base_url: str) -> Dict:
                 form_action = urljoin(base_url, form_action)
             
             form_domain = urlparse(form_action).netloc
-            form_domain_parts = tldextract.extract(form_domain)
+            form_domain_parts = extract_tld(form_domain)
             form_domain_normalized = f"{form_domain_parts.domain}.{form_domain_parts.suffix}"
             
             if form_domain_normalized and form_domain_normalized != base_domain_normalized:
-                external_forms.append(form_domain_normalized)
+                external_forms[form_domain_normalized] = None
+                if len(external_forms) >= 3:
+                    break
         except:
             pass
     
     if external_forms:
-        unique_external = list(set(external_forms))[:3]
         score += 15
-        reasons.append(f"Form submits to external domain: {', '.join(unique_external)}")
+        reasons.append(f"Form submits to external domain: {', '.join(external_forms)}")
     
     return {
         "score": min(score, 100),
@@ -231,7 +290,7 @@ def analyze_domain(url: str) -> Dict:
     score = 0
     
     try:
-        extracted = tldextract.extract(url)
+        extracted = extract_tld(url)
         domain = f"{extracted.domain}.{extracted.suffix}"
         tld = f".{extracted.suffix}"
         
@@ -256,25 +315,24 @@ def analyze_domain(url: str) -> Dict:
     }
 
 
-async def fetch_html(url: str) -> str:
+async def fetch_html(url: str) -> bytes:
     """
     Fetch HTML content from URL.
     
     Returns:
-        str: HTML content, or empty string if fetch fails
+        bytes: raw response body (not decoded), or empty bytes if fetch fails
     """
     try:
-        async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
-            response = await client.get(url, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
-            response.raise_for_status()
-            return response.text
+        response = await get_client().get(url, follow_redirects=True, headers={
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
+        response.raise_for_status()
+        return response.content
     except Exception:
-        return ""
+        return b""
 
 
-async def analyze_with_ai(url: str, html: str = None) -> dict:
+async def analyze_with_ai(url: str, html: Union[bytes, str, None] = None) -> dict:
     """
     Analyze URL and HTML content for phishing risk using AI-powered heuristics.
     
@@ -1,13 +1,33 @@
 import socket
 import ssl
+import threading
 from datetime import datetime
 
 import whois
+from cachetools import TTLCache
+
+from app.services.ssl_context import SSL_CONTEXT
+
+# WHOIS answers change rarely and each lookup is a slow network round trip.
+# Guarded by a lock because lookups may run in worker threads.
+_WHOIS_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=24 * 3600)
+_WHOIS_LOCK = threading.Lock()
+
+
+def whois_cached(domain: str):
+    with _WHOIS_LOCK:
+        cached = _WHOIS_CACHE.get(domain)
+    if cached is not None:
+        return cached
+    w = whois.whois(domain)
+    with _WHOIS_LOCK:
+        _WHOIS_CACHE[domain] = w
+    return w
 
 
 def get_domain_age(domain: str):
     try:
-        w = whois.whois(domain)
+        w = whois_cached(domain)
 
         creation_date = w.creation_date
         if isinstance(creation_date, list):
@@ -29,9 +49,9 @@ def get_domain_age(domain: str):
 
 def get_ssl_info(domain: str):
     try:
-        ctx = ssl.create_default_context()
-        with socket.create_connection((domain, 443)) as sock:
-            with ctx.wrap_socket(sock, server_hostname=domain) as ssock:
+        # Bounded so one unresponsive host can't hang a worker thread
+        with socket.create_connection((domain, 443), timeout=5) as sock:
+            with SSL_CONTEXT.wrap_socket(sock, server_hostname=domain) as ssock:
                 cert = ssock.getpeercert()
 
         issuer = cert.get("issuer")
@@ -42,6 +62,9 @@ def get_ssl_info(domain: str):
             "issuer": issuer,
             "valid_from": valid_from,
             "valid_to": valid_to,
+            # Epoch seconds, parsed once so callers can compare integers
+            "valid_from_ts": int(ssl.cert_time_to_seconds(valid_from)) if valid_from else None,
+            "valid_to_ts": int(ssl.cert_time_to_seconds(valid_to)) if valid_to else None,
             "error": None,
         }
 
@@ -50,6 +73,8 @@ def get_ssl_info(domain: str):
             "issuer": None,
             "valid_from": None,
             "valid_to": None,
+            "valid_from_ts": None,
+            "valid_to_ts": None,
             "error": str(e),
         }
 
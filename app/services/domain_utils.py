@@ -1,11 +1,24 @@
+import asyncio
+import contextlib
 import socket
-import ssl
 import datetime
-import whois
+import threading
+
+from cachetools import TTLCache
+
+from app.services.domain_ssl_service import whois_cached
+from app.services.ssl_context import SSL_CONTEXT
+
+# Certificates for a domain rarely change within a day; only successful
+# lookups are cached so a transient failure is retried on the next scan.
+_SSL_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=24 * 3600)
+_SSL_LOCK = threading.Lock()
+
 
 def get_domain_age(domain):
     try:
-        w = whois.whois(domain)
+        # Shares the day-long WHOIS cache with domain_ssl_service
+        w = whois_cached(domain)
 
         # Some WHOIS providers return lists
         created = w.creation_date
@@ -32,51 +45,102 @@ def get_domain_age(domain):
 
 
 def get_ssl_certificate(domain):
+    cached = _cached_certificate(domain)
+    if cached is not None:
+        return cached
     try:
-        ctx = ssl.create_default_context()
-        with ctx.wrap_socket(socket.socket(), server_hostname=domain) as s:
+        with SSL_CONTEXT.wrap_socket(socket.socket(), server_hostname=domain) as s:
             s.settimeout(5)
             s.connect((domain, 443))
             cert = s.getpeercert()
+        info = _certificate_info(cert)
+    except Exception as e:
+        info = _certificate_error(e)
+    _cache_certificate(domain, info)
+    return info
+
+
+async def get_ssl_certificate_async(domain):
+    """
+    get_ssl_certificate with the TCP+TLS handshake done on the event loop
+    instead of blocking it.
+    """
+    cached = _cached_certificate(domain)
+    if cached is not None:
+        return cached
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(domain, 443, ssl=SSL_CONTEXT, server_hostname=domain),
+            timeout=5,
+        )
+        try:
+            cert = writer.get_extra_info("peercert")
+        finally:
+            writer.close()
+            # Drain the TLS close; the certificate is already in hand, so a
+            # peer that never answers the close must not fail the lookup
+            with contextlib.suppress(Exception):
+                await asyncio.wait_for(writer.wait_closed(), timeout=5)
+        info = _certificate_info(cert)
+    except asyncio.TimeoutError:
+        info = _certificate_error("timed out")
+    except Exception as e:
+        info = _certificate_error(e)
+    _cache_certificate(domain, info)
+    return info
+
 
-        valid_from = cert["notBefore"]
-        valid_to = cert["notAfter"]
+def _cached_certificate(domain):
+    with _SSL_LOCK:
+        return _SSL_CACHE.get(domain)
+
+
+def _cache_certificate(domain, info):
+    if info["valid"]:
+        with _SSL_LOCK:
+            _SSL_CACHE[domain] = info
+
+
+def _certificate_info(cert):
+    valid_from = cert["notBefore"]
+    valid_to = cert["notAfter"]
+    
+    # Format issuer as readable string
+    issuer_raw = cert.get("issuer")
+    issuer_str = "Unknown"
+    
+    if issuer_raw:
+        # issuer is a tuple of tuples like ((('countryName', 'US'),), (('organizationName', 'Google Trust Services'),), ...)
+        issuer_parts = {}
+        for rdn in issuer_raw:
+            for name_tuple in rdn:
+                if len(name_tuple) == 2:
+                    issuer_parts[name_tuple[0]] = name_tuple[1]
         
-        # Format issuer as readable string
-        issuer_raw = cert.get("issuer")
-        issuer_str = "Unknown"
+        # Build readable string: "Organization - Common Name"
+        org = issuer_parts.get('organizationName', '')
+        cn = issuer_parts.get('commonName', '')
         
-        if issuer_raw:
-            # issuer is a tuple of tuples like ((('countryName', 'US'),), (('organizationName', 'Google Trust Services'),), ...)
-            issuer_parts = {}
-            for rdn in issuer_raw:
-                for name_tuple in rdn:
-                    if len(name_tuple) == 2:
-                        issuer_parts[name_tuple[0]] = name_tuple[1]
-            
-            # Build readable string: "Organization - Common Name"
-            org = issuer_parts.get('organizationName', '')
-            cn = issuer_parts.get('commonName', '')
-            
-            if org and cn:
-                issuer_str = f"{org} - {cn}"
-            elif org:
-                issuer_str = org
-            elif cn:
-                issuer_str = cn
+        if org and cn:
+            issuer_str = f"{org} - {cn}"
+        elif org:
+            issuer_str = org
+        elif cn:
+            issuer_str = cn
 
-        return {
-            "issuer": issuer_str,
-            "valid_from": valid_from,
-            "valid_to": valid_to,
-            "valid": True,
-        }
+    return {
+        "issuer": issuer_str,
+        "valid_from": valid_from,
+        "valid_to": valid_to,
+        "valid": True,
+    }
 
-    except Exception as e:
-        return {
-            "issuer": "Unknown",
-            "valid_from": None,
-            "valid_to": None,
-            "valid": False,
-            "error": str(e)
-        }
\ No newline at end of file
+
+def _certificate_error(e):
+    return {
+        "issuer": "Unknown",
+        "valid_from": None,
+        "valid_to": None,
+        "valid": False,
+        "error": str(e)
+    }
\ No newline at end of file
@@ -1,10 +1,17 @@
 # src/services/email_scanner_service.py
+import asyncio
 import re
 import math
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
 
-import tldextract
+import dns.asyncresolver
+import dns.resolver
+from rapidfuzz.distance import Levenshtein
 
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.tld_utils import extract as extract_tld
+from app.services.gsb_service import check_google_safe_browsing_batch
 from app.services.url_scanner_service import scan_url_service
 from app.services.redirect_chain_service import get_redirect_chain
 from app.services.domain_ssl_service import get_domain_age
@@ -18,63 +25,159 @@ FREE_PROVIDERS = {
     "icloud.com",
 }
 
+MAX_EMAIL_URLS = 20  # allow more in email analyzer but still capped
+URL_SCAN_CONCURRENCY = 10
+
+_RESOLVER = dns.asyncresolver.Resolver()
+_RESOLVER.lifetime = 5.0
+
+URL_RE = re.compile(r"https?://[^\s'\"<>]+")
+URGENCY_RE = re.compile(r"\burgent\b|\bimmediate\b|\bverify\b|\baction required\b|\bsuspend(ed)?\b")
+CREDENTIAL_RE = re.compile(
+    r"enter (your )?password|provide (your )?password|confirm (your )?account|update billing|verify payment"
+)
+DISPLAY_NAME_RE = re.compile(r'^(.*)<([^>]+)>')
+NONWORD_RE = re.compile(r"\W+")
+
+EXECUTABLE_EXTENSIONS = frozenset({"exe", "scr", "js", "hta", "vbs", "bat", "msi", "cmd", "jar"})
+ARCHIVE_EXTENSIONS = frozenset({"zip", "rar"})
+# Attachment types that add the extra heuristic boost on top of the score
+BOOSTED_EXTENSIONS = frozenset({"exe", "js", "hta", "scr", "vbs", "msi"})
+
+# Per-click tracking parameters; links differing only in these share a scan
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "_hsenc", "_hsmi"})
+
+RISK_KEYWORDS = ["password", "bank", "billing", "invoice", "verify", "suspend", "secure", "confirm"]
+RISK_KEYWORD_MATCHER = KeywordMatcher({"risk": RISK_KEYWORDS})
+
 
 def _extract_urls_from_text(text: str) -> List[str]:
-    url_pattern = r"https?://[^\s'\"<>]+"
-    return re.findall(url_pattern, text or "")
-
-
-def _levenshtein(a: str, b: str) -> int:
-    a = a or ""
-    b = b or ""
-    if a == b:
-        return 0
-    if len(a) == 0:
-        return len(b)
-    if len(b) == 0:
-        return len(a)
-    prev = list(range(len(b) + 1))
-    for i, ca in enumerate(a, start=1):
-        cur = [i] + [0] * len(b)
-        for j, cb in enumerate(b, start=1):
-            cost = 0 if ca == cb else 1
-            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
-        prev = cur
-    return prev[-1]
+    return URL_RE.findall(text or "")
+
+
+def _levenshtein(a: str, b: str, max_dist: Optional[int] = None) -> int:
+    # rapidfuzz's C implementation (bit-parallel for short strings).
+    # With max_dist, stops early and returns max_dist + 1 once it is exceeded.
+    return Levenshtein.distance(a or "", b or "", score_cutoff=max_dist)
+
+
+def _build_url_report(raw_url: str, scan_result: Any, redirect_chain: Any) -> Dict[str, Any]:
+    # The scan and the redirect trace fail independently; a failure only
+    # replaces its own fields with the error shape
+    if isinstance(redirect_chain, Exception):
+        redirect_chain = {
+            "chain": [{
+                "url": raw_url,
+                "status": 0,
+                "duration_ms": 0,
+                "error": f"Redirect chain analysis failed: {str(redirect_chain)}",
+            }]
+        }
+    if isinstance(scan_result, Exception):
+        return {
+            "url": raw_url,
+            "label": "error",
+            "rule_based_score": None,
+            "final_score": None,
+            "reasons": [f"URL scan failed: {str(scan_result)}"],
+            "domain_age": None,
+            "ssl_info": None,
+            "redirect_chain": redirect_chain or {"chain": []},
+        }
+    return {
+        "url": scan_result.get("url", raw_url),
+        "label": scan_result.get("label") or "unknown",
+        "rule_based_score": scan_result.get("score"),
+        "final_score": scan_result.get("score"),
+        "reasons": scan_result.get("reasons", []),
+        "domain_age": scan_result.get("domain_age"),
+        "ssl_info": scan_result.get("ssl_info"),
+        "redirect_chain": redirect_chain or {"chain": []},
+    }
+
+
+def _with_scheme(url: str) -> str:
+    # Same default scheme scan_url_service applies
+    return url if url.startswith(("http://", "https://")) else "http://" + url
+
+
+def _scan_key(url: str) -> Tuple[str, str, str, Tuple[Tuple[str, str], ...]]:
+    """
+    Links that differ only in fragment or tracking parameters (utm_*,
+    fbclid, ...) share one scan within an email. Every other query
+    parameter is part of the key: redirectors such as /url?q=<target> must
+    be scanned and traced once per target.
+    """
+    try:
+        parts = urlsplit(_with_scheme(url))
+    except ValueError:
+        return ("", "", url, ())
+    query = tuple(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_") and name.lower() not in TRACKING_PARAMS
+    )
+    return (parts.scheme.lower(), parts.netloc.lower(), parts.path, query)
 
 
 async def _analyze_urls(urls: List[str]) -> List[Dict[str, Any]]:
-    per_url_reports: List[Dict[str, Any]] = []
-    for raw_url in urls[:20]:  # allow more in email analyzer but still capped
+    urls = urls[:MAX_EMAIL_URLS]
+    # First link seen for each scan key; only these are actually scanned
+    scanned_url_by_key: Dict[Tuple, str] = {}
+    for u in urls:
+        scanned_url_by_key.setdefault(_scan_key(u), u)
+
+    # One Safe Browsing request for every link; it primes the verdict cache
+    # that each scan_url_service call below reads from. URLs are passed the
+    # way scan_url_service normalizes them.
+    await check_google_safe_browsing_batch([_with_scheme(u) for u in scanned_url_by_key.values()])
+
+    # URLs are independent: scan them concurrently, a bounded number at a time
+    sem = asyncio.Semaphore(URL_SCAN_CONCURRENCY)
+
+    async def analyze_one(raw_url: str) -> Dict[str, Any]:
+        async with sem:
+            scan_result, redirect_chain = await asyncio.gather(
+                scan_url_service(raw_url),
+                get_redirect_chain(raw_url),
+                return_exceptions=True,
+            )
         try:
-            scan_result = await scan_url_service(raw_url)
-            redirect_chain = await get_redirect_chain(raw_url)
-            report = {
-                "url": scan_result.get("url", raw_url),
-                "label": scan_result.get("label") or "unknown",
-                "rule_based_score": scan_result.get("score"),
-                "final_score": scan_result.get("score"),
-                "reasons": scan_result.get("reasons", []),
-                "domain_age": scan_result.get("domain_age"),
-                "ssl_info": scan_result.get("ssl_info"),
-                "redirect_chain": redirect_chain or {"chain": []},
-            }
+            return _build_url_report(raw_url, scan_result, redirect_chain)
         except Exception as exc:
-            report = {
-                "url": raw_url,
-                "label": "error",
-                "rule_based_score": None,
-                "final_score": None,
-                "reasons": [f"URL scan failed: {str(exc)}"],
-                "domain_age": None,
-                "ssl_info": None,
-                "redirect_chain": {"chain": []},
-            }
+            return _build_url_report(raw_url, exc, redirect_chain)
+
+    reports = await asyncio.gather(*(analyze_one(u) for u in scanned_url_by_key.values()))
+    report_by_key = dict(zip(scanned_url_by_key, reports))
+
+    per_url_reports: List[Dict[str, Any]] = []
+    for u in urls:
+        key = _scan_key(u)
+        report = report_by_key[key]
+        if scanned_url_by_key[key] != u:
+            # Shared verdict, reported under the link as it appeared
+            report = {**report, "url": _with_scheme(u)}
         per_url_reports.append(report)
     return per_url_reports
 
 
-def _analyze_sender_domain(sender: str) -> Dict[str, Any]:
+async def _txt_records(name: str) -> List[str]:
+    answer = await _RESOLVER.resolve(name, "TXT")
+    return [b"".join(rdata.strings).decode("utf-8", "replace") for rdata in answer]
+
+
+def _policy_record_report(lookup: Any, prefix: str, label: str) -> Dict[str, Any]:
+    if isinstance(lookup, (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer)):
+        return {"status": "missing", "details": f"No {label} record published."}
+    if isinstance(lookup, Exception):
+        return {"status": "unknown", "details": f"{label} lookup failed: {str(lookup)}"}
+    records = [r for r in lookup if r.lower().startswith(prefix)]
+    if not records:
+        return {"status": "missing", "details": f"No {label} record published."}
+    return {"status": "present", "record": records[0], "details": f"{label} record published."}
+
+
+async def _analyze_sender_domain(sender: str) -> Dict[str, Any]:
     sender_report: Dict[str, Any] = {}
     if not sender:
         sender_report["present"] = False
@@ -95,16 +198,24 @@ def _analyze_sender_domain(sender: str) -> Dict[str, Any]:
         sender_report["email_type"] = "business_or_custom"
 
     if domain_part:
-        try:
-            domain_age = get_domain_age(domain_part)
-        except Exception as exc:
-            domain_age = {"age_days": None, "error": str(exc)}
+        # WHOIS is blocking, so it runs in a worker thread; DNS lookups are async
+        domain_age, spf_lookup, dmarc_lookup = await asyncio.gather(
+            asyncio.to_thread(get_domain_age, domain_part),
+            _txt_records(domain_part),
+            _txt_records(f"_dmarc.{domain_part}"),
+            return_exceptions=True,
+        )
+        if isinstance(domain_age, Exception):
+            domain_age = {"age_days": None, "error": str(domain_age)}
         sender_report["domain_age"] = domain_age
+        sender_report["spf"] = _policy_record_report(spf_lookup, "v=spf1", "SPF")
+        sender_report["dmarc"] = _policy_record_report(dmarc_lookup, "v=dmarc1", "DMARC")
     else:
         sender_report["domain_age"] = None
+        sender_report["spf"] = {"status": "unknown", "details": "No sender domain to check."}
+        sender_report["dmarc"] = {"status": "unknown", "details": "No sender domain to check."}
 
-    sender_report["spf"] = {"status": "unknown", "details": "SPF not checked in this service."}
-    sender_report["dmarc"] = {"status": "unknown", "details": "DMARC not checked in this service."}
+    # DKIM needs the selector from the message's DKIM-Signature header
     sender_report["dkim"] = {"status": "unknown", "details": "DKIM not checked in this service."}
 
     return sender_report
@@ -124,20 +235,14 @@ async def scan_email_service(
     # 1. extract urls from subject/body
     extracted_from_body = _extract_urls_from_text(body)
     extracted_from_subject = _extract_urls_from_text(subject)
-    all_urls: List[str] = []
-    seen = set()
-    for u in links + extracted_from_subject + extracted_from_body:
-        if not u:
-            continue
-        if u not in seen:
-            seen.add(u)
-            all_urls.append(u)
-
-    # 2. per-url analysis
-    per_url_reports = await _analyze_urls(all_urls)
+    # Ordered de-duplication, empty entries dropped
+    all_urls: List[str] = list(dict.fromkeys(u for u in (*links, *extracted_from_subject, *extracted_from_body) if u))
 
-    # 3. sender domain analysis
-    sender_report = _analyze_sender_domain(sender)
+    # 2. per-url analysis and 3. sender domain analysis are independent
+    per_url_reports, sender_report = await asyncio.gather(
+        _analyze_urls(all_urls),
+        _analyze_sender_domain(sender),
+    )
 
     # ---------- Rule-based scoring ----------
     url_component = 0
@@ -167,13 +272,15 @@ async def scan_email_service(
     # attachments
     attachment_component = 0
     attachment_reasons = []
+    attachment_exts = []
     for a in attachments:
         filename = a.get("filename", "").lower()
-        ext = filename.split(".")[-1] if "." in filename else ""
-        if ext in ("exe", "scr", "js", "hta", "vbs", "bat", "msi", "cmd", "jar"):
+        ext = filename.rsplit(".", 1)[-1] if "." in filename else ""
+        attachment_exts.append(ext)
+        if ext in EXECUTABLE_EXTENSIONS:
             attachment_component = max(attachment_component, 30)
             attachment_reasons.append(f"Suspicious attachment type: .{ext}")
-        elif ext in ("zip", "rar"):
+        elif ext in ARCHIVE_EXTENSIONS:
             attachment_component = max(attachment_component, 12)
             attachment_reasons.append(f"Archive attachment: .{ext}")
 
@@ -181,14 +288,14 @@ async def scan_email_service(
     subj_body_component = 0
     subj_body_reasons = []
     combined_text = f"{subject or ''}\n{body or ''}".lower()
-    if re.search(r"\burgent\b|\bimmediate\b|\bverify\b|\baction required\b|\bsuspend(ed)?\b", combined_text):
+    if URGENCY_RE.search(combined_text):
         subj_body_component += 15
         subj_body_reasons.append("Urgency language detected")
-    if re.search(r"enter (your )?password|provide (your )?password|confirm (your )?account|update billing|verify payment", combined_text):
+    if CREDENTIAL_RE.search(combined_text):
         subj_body_component += 25
         subj_body_reasons.append("Explicit credential/payment request language detected")
     
-    keyword_hits = sum(1 for k in ["password", "bank", "billing", "invoice", "verify", "suspend", "secure", "confirm"] if k in combined_text)
+    keyword_hits = len(RISK_KEYWORD_MATCHER.hits(combined_text))
     subj_body_component += min(10, keyword_hits * 3)
 
     # impersonation heuristics
@@ -196,7 +303,7 @@ async def scan_email_service(
     impersonation_reasons = []
     try:
         display_name = ""
-        m = re.match(r'^(.*)<([^>]+)>', sender or "")
+        m = DISPLAY_NAME_RE.match(sender or "")
         if m:
             display_name = m.group(1).strip().strip('"').strip()
         else:
@@ -208,8 +315,9 @@ async def scan_email_service(
     if display_name and "@" in sender:
         send_local = sender.split("@")[0].lower()
         if display_name and len(display_name) >= 4:
-            dist = _levenshtein(re.sub(r"\W+", "", display_name.lower()), re.sub(r"\W+", "", send_local.lower()))
-            if dist > max(3, int(0.2 * max(len(display_name), len(send_local)))):
+            max_dist = max(3, int(0.2 * max(len(display_name), len(send_local))))
+            dist = _levenshtein(NONWORD_RE.sub("", display_name.lower()), NONWORD_RE.sub("", send_local), max_dist)
+            if dist > max_dist:
                 impersonation_score += 8
                 impersonation_reasons.append("Display name and email local part do not match (possible impersonation)")
 
@@ -240,7 +348,7 @@ async def scan_email_service(
     if per_url_reports:
         first_url = per_url_reports[0].get("url") or ""
         if first_url:
-            ex = tldextract.extract(first_url)
+            ex = extract_tld(first_url)
             if ex.suffix:
                 first_link_domain = f"{ex.domain}.{ex.suffix}".lower()
             else:
@@ -249,7 +357,7 @@ async def scan_email_service(
     if sender_domain and first_link_domain and sender_domain != first_link_domain:
         heuristic_boost += 10
 
-    if any((a.get("filename", "").lower().endswith(ext) for a in attachments for ext in [".exe", ".js", ".hta", ".scr", ".vbs", ".msi"])):
+    if any(ext in BOOSTED_EXTENSIONS for ext in attachment_exts):
         heuristic_boost += 20
 
     final_score = max(0, min(100, final_score + heuristic_boost))
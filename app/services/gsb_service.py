@@ -1,21 +1,44 @@
-import httpx
+from typing import Dict, List
+
+from cachetools import TTLCache
+
 from app.config import settings
+from app.services.http_client import get_client
 
 
 GSB_API_URL = "https://safebrowsing.googleapis.com/v4/threatMatches:find"
 
 
-async def check_google_safe_browsing(url: str) -> dict:
+# Verdicts for recently checked URLs, so a batch lookup (e.g. for all links
+# in an email) also answers the per-URL checks that follow it
+_VERDICT_CACHE: TTLCache = TTLCache(maxsize=4096, ttl=300)
+
+
+def _not_flagged() -> dict:
+    return {"flagged": False, "details": {}}
+
+
+def _lookup_failed(error: str) -> dict:
+    # Not flagged, but marked so callers can tell it was never checked
+    return {"flagged": False, "details": {}, "error": error}
+
+
+async def check_google_safe_browsing_batch(urls: List[str]) -> Dict[str, dict]:
     """
-    Returns:
-        {
-          "flagged": bool,
-          "details": dict
-        }
+    Check several URLs with a single threatMatches:find request.
+
+    Returns a {"flagged": bool, "details": dict} result per URL, where
+    details holds the matches reported for that URL. If the lookup itself
+    failed, the result also has an "error" message.
     """
     api_key = settings.google_safe_browsing_api_key
     if not api_key:
-        return {"flagged": False, "details": {}}
+        return {url: _not_flagged() for url in urls}
+
+    results = {url: _VERDICT_CACHE[url] for url in urls if url in _VERDICT_CACHE}
+    pending = [url for url in dict.fromkeys(urls) if url not in results]
+    if not pending:
+        return results
 
     payload = {
         "client": {
@@ -31,22 +54,47 @@ async def check_google_safe_browsing(url: str) -> dict:
             ],
             "platformTypes": ["ANY_PLATFORM"],
             "threatEntryTypes": ["URL"],
-            "threatEntries": [{"url": url}]
+            "threatEntries": [{"url": url} for url in pending]
         }
     }
 
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                f"{GSB_API_URL}?key={api_key}",
-                json=payload,
-                timeout=5
-            )
-            data = resp.json()
-            flagged = "matches" in data
-            return {"flagged": flagged, "details": data}
+        resp = await get_client().post(
+            f"{GSB_API_URL}?key={api_key}",
+            json=payload,
+            timeout=5
+        )
+        data = resp.json()
+    except Exception as e:
+        results.update({url: _lookup_failed(str(e)) for url in pending})
+        return results
 
-    except Exception:
-        return {"flagged": False, "details": {}}
+    if not resp.is_success:
+        error = f"Safe Browsing returned HTTP {resp.status_code}"
+        results.update({url: _lookup_failed(error) for url in pending})
+        return results
 
+    matches_by_url: Dict[str, list] = {}
+    for match in data.get("matches", []):
+        matches_by_url.setdefault(match.get("threat", {}).get("url"), []).append(match)
 
+    for url in pending:
+        matches = matches_by_url.get(url)
+        result = {"flagged": True, "details": {"matches": matches}} if matches else _not_flagged()
+        # Only successful answers get here, so errors are retried next time
+        _VERDICT_CACHE[url] = result
+        results[url] = result
+    return results
+
+
+async def check_google_safe_browsing(url: str) -> dict:
+    """
+    Returns:
+        {
+          "flagged": bool,
+          "details": dict,
+          "error": str  # only if the lookup failed
+        }
+    """
+    results = await check_google_safe_browsing_batch([url])
+    return results[url]
@@ -1,5 +1,12 @@
 from datetime import datetime
 
+from dateutil import parser, tz
+
+# Local timezone, built once; naive WHOIS dates are assumed to be local.
+# tzlocal() follows DST transitions, unlike a fixed offset captured at import
+_LOCAL_TZ = tz.tzlocal()
+
+
 def safe_parse_whois_date(value):
     """
     Safely parse WHOIS date formats into a timezone-aware datetime.
@@ -11,27 +18,26 @@ def safe_parse_whois_date(value):
     if isinstance(value, datetime):
         # Make timezone-aware if it is not
         if value.tzinfo is None:
-            return value.replace(tzinfo=datetime.utcnow().astimezone().tzinfo)
+            return value.replace(tzinfo=_LOCAL_TZ)
         return value
 
     try:
         parsed = datetime.strptime(value, "%Y-%m-%d")
-        return parsed.replace(tzinfo=datetime.utcnow().astimezone().tzinfo)
-    except:
+        return parsed.replace(tzinfo=_LOCAL_TZ)
+    except (ValueError, TypeError):
         pass
 
     try:
         parsed = datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
-        return parsed.replace(tzinfo=datetime.utcnow().astimezone().tzinfo)
-    except:
+        return parsed.replace(tzinfo=_LOCAL_TZ)
+    except (ValueError, TypeError):
         pass
 
     # Last fallback: try flexible parser
     try:
-        from dateutil import parser
         parsed = parser.parse(value)
         if parsed.tzinfo is None:
-            parsed = parsed.replace(tzinfo=datetime.utcnow().astimezone().tzinfo)
+            parsed = parsed.replace(tzinfo=_LOCAL_TZ)
         return parsed
-    except:
+    except (ValueError, TypeError, OverflowError):
         return None
\ No newline at end of file
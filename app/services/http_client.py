@@ -0,0 +1,41 @@
+"""
+Process-wide httpx client.
+
+Creating an `httpx.AsyncClient` per call pays for DNS, TCP and TLS setup on
+every request. Services share this one client instead so connections to
+repeated hosts (Safe Browsing, OpenPhish, ...) are kept alive and reused.
+
+The client never stores cookies: it fetches arbitrary, possibly hostile,
+pages on behalf of every user, so cookies set by one scanned site must not be
+sent on later scans or change their redirect chains.
+"""
+
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Optional
+
+import httpx
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the shared client, creating it on first use.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=200),
+            http2=True,
+            # Rejects every cookie, so the jar stays empty
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -6,8 +6,9 @@ This is not meant to be run directly, but shows where and how to integrate
 the new functionality.
 """
 
-# In url_scanner_service.py, you would add the import:
+# In url_scanner_service.py, you would add the imports:
 # from app.services.ai_phish_analyzer import analyze_page
+# from app.services.http_client import get_client
 
 # Then in the scan_url_service function, you could add:
 
@@ -20,9 +21,9 @@ async def scan_url_service_with_ai_integration(url: str) -> dict:
     # After getting the HTML content (around line 150 in the original)
     html_content = None
     try:
-        async with httpx.AsyncClient(timeout=8.0, follow_redirects=True) as client:
-            resp = await client.get(url)
-            html_content = resp.text[:200_000]
+        # Shared keep-alive client instead of a new connection pool per scan
+        resp = await get_client().get(url, timeout=8.0, follow_redirects=True)
+        html_content = resp.text[:200_000]
     except Exception:
         html_content = None
 
@@ -0,0 +1,55 @@
+"""
+Multi-pattern keyword matching.
+
+Builds a single Aho-Corasick automaton over several named phrase lists so a
+piece of text can be checked against all of them in one linear pass, instead
+of running `phrase in text` once per phrase.
+"""
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+import ahocorasick
+
+
+class KeywordMatcher:
+    """
+    Match phrases from several categories against text in a single pass.
+
+    Phrases are lowercased once here; callers pass text that is already
+    lowercased, so a hit is equivalent to `phrase.lower() in text`.
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]]):
+        # (original phrase, lowercased key) pairs, in declaration order
+        self._categories: Dict[str, List[Tuple[str, str]]] = {
+            name: [(phrase, phrase.lower()) for phrase in phrases]
+            for name, phrases in categories.items()
+        }
+        self._automaton = ahocorasick.Automaton()
+        for pairs in self._categories.values():
+            for _, key in pairs:
+                if key not in self._automaton:
+                    self._automaton.add_word(key, key)
+        self._empty = len(self._automaton) == 0
+        if not self._empty:
+            self._automaton.make_automaton()
+
+    def hits(self, text_lower: str) -> Set[str]:
+        """
+        Return the set of (lowercased) phrases found anywhere in text_lower.
+        """
+        if self._empty or not text_lower:
+            return set()
+        return {key for _, key in self._automaton.iter(text_lower)}
+
+    def find(self, text_lower: str) -> Dict[str, List[str]]:
+        """
+        Return, per category, the phrases found in text_lower.
+
+        Phrases are reported in the order they were declared for the category.
+        """
+        found = self.hits(text_lower)
+        return {
+            name: [phrase for phrase, key in pairs if key in found]
+            for name, pairs in self._categories.items()
+        }
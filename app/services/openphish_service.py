@@ -1,22 +1,73 @@
-import httpx
+import asyncio
+import hashlib
+import logging
+from array import array
+from bisect import bisect_left
+from urllib.parse import urlsplit, urlunsplit
+
 from app.config import settings
+from app.services.http_client import get_client
+
+logger = logging.getLogger(__name__)
+
+FEED_REFRESH_SECONDS = 3600
+
+
+def normalize_feed_url(url: str) -> str:
+    """
+    Canonical form used for feed lookups: lowercase scheme and host, no
+    fragment, no trailing slash, so trivial variants of a listed URL match.
+    """
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+
+
+def _url_hash(url: str) -> int:
+    return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), "little")
 
 
 class OpenPhish:
     def __init__(self):
-        self.urls = set()
+        # Sorted 64-bit hashes of the normalized feed URLs: 8 bytes per entry
+        # instead of a str object plus set slot each
+        self.hashes = array("Q")
 
     async def load_feed(self):
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(settings.openphish_feed_url, timeout=10)
-                lines = resp.text.splitlines()
-                self.urls = set(line.strip() for line in lines if line.strip())
-        except Exception:
-            self.urls = set()
+            hashes = set()
+            # Hash lines as they arrive instead of buffering the whole feed
+            async with get_client().stream("GET", settings.openphish_feed_url, timeout=10) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if not line.strip():
+                        continue
+                    try:
+                        hashes.add(_url_hash(normalize_feed_url(line)))
+                    except ValueError:
+                        # One malformed entry must not discard the whole feed
+                        continue
+            # Build the new array fully, then swap it in
+            self.hashes = array("Q", sorted(hashes))
+        except Exception as e:
+            # Keep serving the previous feed rather than an empty one
+            logger.warning("Could not load OpenPhish feed: %s", e)
+
+    async def refresh_forever(self, interval: float = FEED_REFRESH_SECONDS):
+        """
+        Reload the feed every `interval` seconds; run as a background task.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            await self.load_feed()
 
     def is_phishing(self, url: str) -> bool:
-        return url in self.urls
+        try:
+            h = _url_hash(normalize_feed_url(url))
+        except ValueError:
+            # urlsplit rejects some malformed URLs; they can't be in the feed
+            return False
+        i = bisect_left(self.hashes, h)
+        return i < len(self.hashes) and self.hashes[i] == h
 
 
 openphish = OpenPhish()
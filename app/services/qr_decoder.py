@@ -1,6 +1,51 @@
+import threading
+
 import numpy as np
 import cv2
-from pyzbar.pyzbar import decode as pyzbar_decode
+
+# pyzbar needs the native zbar library; OpenCV's detector is tried first and
+# pyzbar, when available, is only the fallback for codes OpenCV can't read.
+try:
+    from pyzbar.pyzbar import decode as pyzbar_decode
+except ImportError:
+    pyzbar_decode = None
+
+# The ArUco-based detector (OpenCV >= 4.8) finds codes the classic one misses,
+# e.g. with a wide quiet zone or on a cluttered background, and is faster
+_QRDetector = getattr(cv2, "QRCodeDetectorAruco", cv2.QRCodeDetector)
+
+# Detectors are costly to build and not safe to share between threads, so
+# each thread builds one on first use and keeps it
+_local = threading.local()
+
+
+def _detector():
+    detector = getattr(_local, "detector", None)
+    if detector is None:
+        detector = _local.detector = _QRDetector()
+    return detector
+
+
+# Long-side size for the first, cheap decode attempt
+PREVIEW_SIZE = 400
+# A QR code always has dark/light module edges; below this Sobel magnitude
+# anywhere in the preview the image is flat and cannot contain one
+MIN_EDGE_STRENGTH = 40
+
+
+def _decode(img: np.ndarray) -> str | None:
+    data, _, _ = _detector().detectAndDecode(img)
+    return data or _decode_pyzbar(img)
+
+
+def _decode_pyzbar(img: np.ndarray) -> str | None:
+    if pyzbar_decode is None:
+        return None
+    decoded_objects = pyzbar_decode(img)
+    if not decoded_objects:
+        return None
+
+    return decoded_objects[0].data.decode("utf-8")
 
 
 def decode_qr_image(image_bytes: bytes) -> str | None:
@@ -8,19 +53,39 @@ def decode_qr_image(image_bytes: bytes) -> str | None:
     Takes raw image bytes and returns decoded QR string or None.
     """
     try:
-        # Convert bytes → numpy array → CV2 image
+        # Convert bytes → numpy array → single-channel image; both decoders
+        # work on grayscale, so the color planes are never materialized
         nparr = np.frombuffer(image_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        img = cv2.imdecode(nparr, cv2.IMREAD_GRAYSCALE)
 
         if img is None:
             return None
 
-        decoded_objects = pyzbar_decode(img)
-        if not decoded_objects:
+        h, w = img.shape
+        scale = PREVIEW_SIZE / max(h, w)
+        if scale >= 1:
+            return _decode(img)
+
+        small = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        grad_x = cv2.Sobel(small, cv2.CV_16S, 1, 0)
+        grad_y = cv2.Sobel(small, cv2.CV_16S, 0, 1)
+        if max(int(np.abs(grad_x).max()), int(np.abs(grad_y).max())) < MIN_EDGE_STRENGTH:
             return None
 
-        return decoded_objects[0].data.decode("utf-8")
+        # Most uploads decode at preview size with OpenCV alone
+        data, points, _ = _detector().detectAndDecode(small)
+        if data:
+            return data
+
+        # Full-resolution OpenCV only helps when the preview located a code
+        # it could not read; a busy photo without one would pay ~300 ms for
+        # nothing. pyzbar at full resolution (the original single pass) still
+        # finds codes too small to locate in the preview. Without pyzbar,
+        # OpenCV has to take that pass itself
+        if points is not None or pyzbar_decode is None:
+            data, _, _ = _detector().detectAndDecode(img)
+            if data:
+                return data
+        return _decode_pyzbar(img)
     except Exception:
         return None
-
-
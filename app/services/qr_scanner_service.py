@@ -7,43 +7,12 @@ This service handles QR code scanning with full functionality:
 3. Returns comprehensive scan results with risk scoring
 """
 
-import numpy as np
-import cv2
-from pyzbar.pyzbar import decode as pyzbar_decode
-from typing import Dict, Any, Optional
+from typing import Dict, Any
 
+from app.services.qr_decoder import decode_qr_image
 from app.services.url_scanner_service import scan_url_service
 
 
-def decode_qr_image(image_bytes: bytes) -> Optional[str]:
-    """
-    Decodes a QR code from image bytes.
-    
-    Args:
-        image_bytes: Raw image bytes (PNG, JPG, etc.)
-        
-    Returns:
-        Decoded string from QR code, or None if no QR code found
-    """
-    try:
-        # Convert bytes → numpy array → CV2 image
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-        if img is None:
-            return None
-
-        # Decode QR code
-        decoded_objects = pyzbar_decode(img)
-        if not decoded_objects:
-            return None
-
-        # Return first QR code found
-        return decoded_objects[0].data.decode("utf-8")
-    except Exception:
-        return None
-
-
 async def scan_qr_service(image_bytes: bytes) -> Dict[str, Any]:
     """
     Complete QR code scanning service with threat analysis.
@@ -2,6 +2,8 @@ import httpx
 import time
 from typing import List, Dict
 
+from app.services.http_client import get_client
+
 
 async def get_redirect_chain(url: str) -> Dict:
     """
@@ -22,57 +24,51 @@ async def get_redirect_chain(url: str) -> Dict:
         current_url = "http://" + current_url
     
     try:
-        async with httpx.AsyncClient(follow_redirects=False, timeout=10.0) as client:
-            for i in range(max_redirects):
-                start_time = time.time()
-                try:
-                    response = await client.get(current_url)
-                    duration_ms = round((time.time() - start_time) * 1000)
-                    
-                    chain.append({
-                        "url": str(response.url),
-                        "status": response.status_code,
-                        "duration_ms": duration_ms
-                    })
-                    
-                    # Check if there's a redirect
-                    if response.status_code in [301, 302, 303, 307, 308]:
-                        location = response.headers.get("location")
-                        if location:
-                            # Handle relative redirects
-                            if location.startswith("/"):
-                                parsed_url = httpx.URL(current_url)
-                                current_url = f"{parsed_url.scheme}://{parsed_url.host}{location}"
-                            elif not location.startswith(("http://", "https://")):
-                                # Relative path
-                                current_url = location
-                            else:
-                                current_url = location
-                        else:
-                            break
+        client = get_client()
+        for i in range(max_redirects):
+            start_time = time.time()
+            try:
+                response = await client.get(current_url, follow_redirects=False, timeout=10.0)
+                
+                chain.append({
+                    "url": str(response.url),
+                    "status": response.status_code,
+                    # Measured by httpx from request send to response close
+                    "duration_ms": round(response.elapsed.total_seconds() * 1000)
+                })
+                
+                # Check if there's a redirect
+                if response.status_code in [301, 302, 303, 307, 308]:
+                    location = response.headers.get("location")
+                    if location:
+                        # Resolves absolute, host-relative ("/x"), scheme-relative
+                        # ("//host/x") and path-relative ("x") locations
+                        current_url = str(response.url.join(location))
                     else:
-                        # No more redirects
                         break
-                        
-                except httpx.TimeoutException:
-                    duration_ms = round((time.time() - start_time) * 1000)
-                    chain.append({
-                        "url": current_url,
-                        "status": 408,
-                        "duration_ms": duration_ms,
-                        "error": "Timeout"
-                    })
-                    break
-                except Exception as e:
-                    duration_ms = round((time.time() - start_time) * 1000)
-                    chain.append({
-                        "url": current_url,
-                        "status": 0,
-                        "duration_ms": duration_ms,
-                        "error": str(e)
-                    })
+                else:
+                    # No more redirects
                     break
                     
+            except httpx.TimeoutException:
+                duration_ms = round((time.time() - start_time) * 1000)
+                chain.append({
+                    "url": current_url,
+                    "status": 408,
+                    "duration_ms": duration_ms,
+                    "error": "Timeout"
+                })
+                break
+            except Exception as e:
+                duration_ms = round((time.time() - start_time) * 1000)
+                chain.append({
+                    "url": current_url,
+                    "status": 0,
+                    "duration_ms": duration_ms,
+                    "error": str(e)
+                })
+                break
+                
     except Exception as e:
         return {
             "chain": [{
@@ -1,19 +1,26 @@
 import re
-from difflib import SequenceMatcher
-from urllib.parse import urlparse, parse_qs
+from functools import lru_cache
+from typing import Tuple
+from urllib.parse import ParseResult, urlparse, parse_qs
 
-import tldextract
+from rapidfuzz import fuzz, process
+from tldextract.tldextract import ExtractResult
 
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.tld_utils import extract as extract_tld
 
-# Suspicious patterns
+
+# Suspicious patterns. Only whether a pattern matches somewhere is used, so
+# they are written in their shortest equivalent form: no leading `x+` runs
+# and no trailing `.*`/optional parts, which only add backtracking.
 SUSPICIOUS_PATTERNS = [
-    (r'bit\.ly|tinyurl|goo\.gl|t\.co|short\.link', "URL shortener detected"),
-    (r'login[_-]?.*\.[a-z]{2,}|sign[_-]?in.*\.[a-z]{2,}', "Suspicious login page"),
-    (r'[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}', "IP address in URL"),
-    (r'[a-z0-9-]+\.(tk|ml|ga|cf|gq)', "Suspicious TLD detected"),
-    (r'[a-z0-9]+\.(com|net|org)\.(tk|ml|ga|cf)', "Double domain suspicious pattern"),
-    (r'secure[_-]?.*[_-]?verify|account[_-]?verify|confirm[_-]?.*', "Suspicious verification URL"),
-    (r'[a-z0-9-]+-[a-z0-9-]+-[a-z0-9-]+\.(com|net|org)', "Highly suspicious domain pattern"),
+    (re.compile(r'bit\.ly|tinyurl|goo\.gl|t\.co|short\.link', re.IGNORECASE), "URL shortener detected"),
+    (re.compile(r'login.*\.[a-z]{2}|sign[_-]?in.*\.[a-z]{2}', re.IGNORECASE), "Suspicious login page"),
+    (re.compile(r'[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}\.[0-9]{1,3}', re.IGNORECASE), "IP address in URL"),
+    (re.compile(r'[a-z0-9-]\.(tk|ml|ga|cf|gq)', re.IGNORECASE), "Suspicious TLD detected"),
+    (re.compile(r'[a-z0-9]\.(com|net|org)\.(tk|ml|ga|cf)', re.IGNORECASE), "Double domain suspicious pattern"),
+    (re.compile(r'secure.*verify|account[_-]?verify|confirm', re.IGNORECASE), "Suspicious verification URL"),
+    (re.compile(r'[a-z0-9-]-[a-z0-9-]+-[a-z0-9-]+\.(com|net|org)', re.IGNORECASE), "Highly suspicious domain pattern"),
 ]
 
 # Suspicious keywords
@@ -29,9 +36,11 @@ SUSPICIOUS_KEYWORDS = [
     ("immediately", 4),
     ("action required", 5),
 ]
+SUSPICIOUS_KEYWORD_MATCHER = KeywordMatcher({"keyword": [k for k, _ in SUSPICIOUS_KEYWORDS]})
 
-# Trusted domains (can be expanded)
-TRUSTED_DOMAINS = [
+# Trusted domains (can be expanded). Matched against the registered domain,
+# so subdomains are trusted but e.g. google.com.attacker.net is not
+TRUSTED_DOMAINS = frozenset({
     "google.com",
     "microsoft.com",
     "apple.com",
@@ -40,7 +49,7 @@ TRUSTED_DOMAINS = [
     "bankofamerica.com",
     "wellsfargo.com",
     "chase.com",
-]
+})
 
 # Suspicious query parameters
 SUSPICIOUS_QUERY_PARAMS = [
@@ -48,20 +57,30 @@ SUSPICIOUS_QUERY_PARAMS = [
 ]
 
 
-def _strong_phishing_rules(url: str):
+@lru_cache(maxsize=1024)
+def _parse_once(url: str) -> Tuple[ParseResult, ExtractResult, str]:
+    """
+    Parse a URL once for all rule checks: (urlparse of the lowercased URL,
+    tldextract of its netloc, lowercased URL).
+    """
+    url_lower = url.lower()
+    parsed = urlparse(url_lower)
+    return parsed, extract_tld(parsed.netloc), url_lower
+
+
+def _strong_phishing_rules(parsed_url: ParseResult, tld_parts: ExtractResult) -> Tuple[int, Tuple[str, ...]]:
     """
     Enhanced scoring rules ensuring high-risk phishing URLs exceed threshold.
     """
-    parsed_url = urlparse(url)
-    tld_parts = tldextract.extract(parsed_url.netloc)
+    # Both come from the lowercased URL (see _parse_once)
     domain = tld_parts.domain or parsed_url.netloc
     suffix = tld_parts.suffix
     full_domain = (
-        f"{tld_parts.domain}.{tld_parts.suffix}".lower()
+        f"{tld_parts.domain}.{tld_parts.suffix}"
         if tld_parts.domain and tld_parts.suffix
-        else (tld_parts.domain or parsed_url.netloc).lower()
+        else domain
     )
-    path = (parsed_url.path or "").lower()
+    path = parsed_url.path
 
     score = 0
     reasons = []
@@ -82,19 +101,18 @@ def _strong_phishing_rules(url: str):
         reasons.append("Suspicious keyword found in domain")
 
     known_brands = ["paypal", "google", "facebook", "amazon", "microsoft"]
-    for brand in known_brands:
-        ratio = SequenceMatcher(None, (domain or "").lower(), brand).ratio()
-        if 0.55 < ratio < 0.95:
-            score += 35
-            reasons.append(f"Lookalike domain detected (similar to {brand})")
-            break
+    # Closest brand in one C call; near-identical (>= 95) is the brand itself
+    best = process.extractOne(domain, known_brands, scorer=fuzz.ratio, score_cutoff=55)
+    if best and 55 < best[1] < 95:
+        score += 35
+        reasons.append(f"Lookalike domain detected (similar to {best[0]})")
 
     bad_paths = ["verify", "login", "auth", "update", "security"]
     if any(p in path for p in bad_paths):
         score += 20
         reasons.append("Suspicious path detected")
 
-    return score, reasons
+    return score, tuple(reasons)
 
 
 def check_rule_based(url: str) -> dict:
@@ -109,32 +127,65 @@ def check_rule_based(url: str) -> dict:
           "reasons": list[str]
         }
     """
+    score, reasons, trusted_adjusted = _rule_based_verdict(url)
+
+    details = {}
+    if trusted_adjusted:
+        details["trusted_domain"] = True
+    details["suspiciousness_score"] = score
+
+    return {
+        "flagged": score >= 15,  # Flag if score exceeds threshold
+        "details": details,
+        "score": score,
+        "reasons": list(reasons)
+    }
+
+
+@lru_cache(maxsize=4096)
+def _rule_based_verdict(url: str) -> Tuple[int, Tuple[str, ...], bool]:
+    """
+    The URL-only part of check_rule_based, memoised: returns
+    (score, reasons, trusted-domain adjustment applied).
+    """
     reasons = []
     score = 0
-    details = {}
+    trusted_adjusted = False
     
-    parsed = urlparse(url.lower())
+    parsed, tld_parts, url_lower = _parse_once(url)
     domain = parsed.netloc
     path = parsed.path
-    query_params = parse_qs(parsed.query)
     
     # Check trusted domains (negative score adjustment)
-    is_trusted = any(trusted in domain for trusted in TRUSTED_DOMAINS)
+    is_trusted = (
+        bool(tld_parts.domain and tld_parts.suffix)
+        and f"{tld_parts.domain}.{tld_parts.suffix}" in TRUSTED_DOMAINS
+    )
     
     # Pattern matching
     for pattern, reason in SUSPICIOUS_PATTERNS:
-        if re.search(pattern, url, re.IGNORECASE):
+        if pattern.search(url):
             reasons.append(reason)
             score += 5
     
-    # Keyword checking (in path and domain)
+    # Keyword checking (in path and domain), one pass over both; the NUL
+    # separator keeps a keyword from matching across the two
+    keyword_hits = SUSPICIOUS_KEYWORD_MATCHER.hits(f"{path}\0{domain}")
     for keyword, keyword_score in SUSPICIOUS_KEYWORDS:
-        if keyword in path or keyword in domain:
+        if keyword in keyword_hits:
             reasons.append(f"Suspicious keyword detected: '{keyword}'")
             score += keyword_score
     
-    # Check for suspicious query parameters
-    for param in SUSPICIOUS_QUERY_PARAMS:
+    # Check for suspicious query parameters. Most queries mention none of
+    # the names at all; only decode the query when one might be present
+    # (a percent-escape could spell a name, so those are always decoded)
+    query = parsed.query
+    if "%" in query:
+        candidate_params = SUSPICIOUS_QUERY_PARAMS
+    else:
+        candidate_params = [param for param in SUSPICIOUS_QUERY_PARAMS if param in query]
+    query_params = parse_qs(query) if candidate_params else {}
+    for param in candidate_params:
         if param in query_params:
             reasons.append(f"Suspicious query parameter: '{param}'")
             score += 3
@@ -150,10 +201,14 @@ def check_rule_based(url: str) -> dict:
         reasons.append(f"Too many hyphens in domain ({hyphen_count})")
         score += 3
     
-    # Check for mixed case (phishing domains often use mixed case)
-    if any(c.isupper() for c in parsed.netloc):
-        reasons.append("Mixed case in domain (possible spoofing)")
-        score += 2
+    # Check for mixed case (phishing domains often use mixed case). `parsed`
+    # comes from the lowercased URL, so look at the netloc as given; a URL
+    # that is already all lowercase cannot have one, no need to re-parse it
+    if url != url_lower:
+        raw_netloc = urlparse(url).netloc
+        if raw_netloc != raw_netloc.lower():
+            reasons.append("Mixed case in domain (possible spoofing)")
+            score += 2
     
     # HTTPS check
     if parsed.scheme != "https":
@@ -166,7 +221,7 @@ def check_rule_based(url: str) -> dict:
         score += 3
     
     # Strong phishing heuristics (ensures clearly malicious URLs exceed threshold)
-    strong_score, strong_reasons = _strong_phishing_rules(url)
+    strong_score, strong_reasons = _strong_phishing_rules(parsed, tld_parts)
     if strong_score:
         score += strong_score
         reasons.extend(strong_reasons)
@@ -174,21 +229,9 @@ def check_rule_based(url: str) -> dict:
     # Trusted domain check (reduce score if trusted)
     if is_trusted and score > 0:
         score = max(0, score - 10)
-        details["trusted_domain"] = True
+        trusted_adjusted = True
     
     # Normalize score to 0-100
     score = min(100, score)
-    
-    # Flag if score exceeds threshold
-    flagged = score >= 15
-    
-    details["suspiciousness_score"] = score
-    
-    return {
-        "flagged": flagged,
-        "details": details,
-        "score": score,
-        "reasons": reasons
-    }
-
 
+    return score, tuple(reasons), trusted_adjusted
@@ -0,0 +1,108 @@
+"""
+Short-lived, in-process cache for per-URL scan work.
+
+`/scan/url`, `/url/screenshot` and `/api/url/report` all end up calling
+`scan_url_service` and/or `get_redirect_chain` for the same URL, typically
+a few seconds apart (scan first, then open the report). Results are kept for
+a few minutes, and concurrent requests for the same URL share a single
+upstream call instead of each starting their own. Results in which a lookup
+failed (WHOIS, certificate, Safe Browsing, a redirect hop) are only kept
+briefly, so a transient upstream error is not served for the full TTL.
+
+Every caller gets its own copy of a cached result and may modify it.
+"""
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from cachetools import TTLCache
+
+from app.services.redirect_chain_service import get_redirect_chain
+from app.services.url_scanner_service import scan_url_service
+
+CACHE_TTL_SECONDS = 300
+FAILURE_TTL_SECONDS = 15
+CACHE_MAX_ENTRIES = 1024
+
+
+def normalize_url_key(url: str) -> str:
+    """
+    Cache key for a URL: same scheme default as the services, with the
+    scheme and host lowercased (path and query are case-sensitive).
+    """
+    url = url.strip()
+    if not url.startswith(("http://", "https://")):
+        url = "http://" + url
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, parts.fragment))
+
+
+class AsyncTTLCache:
+    """
+    TTL cache for coroutine results with per-key request coalescing.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = CACHE_MAX_ENTRIES,
+        ttl: float = CACHE_TTL_SECONDS,
+        failure_ttl: float = FAILURE_TTL_SECONDS,
+        is_failure: Optional[Callable[[Any], bool]] = None,
+    ):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._failures: TTLCache = TTLCache(maxsize=maxsize, ttl=failure_ttl)
+        self._is_failure = is_failure
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _lookup(self, key: str) -> Any:
+        try:
+            return self._cache[key]
+        except KeyError:
+            return self._failures[key]
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return copy.deepcopy(self._lookup(key))
+        except KeyError:
+            pass
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                # Another request may have filled the entry while we waited
+                try:
+                    return copy.deepcopy(self._lookup(key))
+                except KeyError:
+                    pass
+                value = await compute()
+                if self._is_failure is not None and self._is_failure(value):
+                    self._failures[key] = value
+                else:
+                    self._cache[key] = value
+                return copy.deepcopy(value)
+        finally:
+            if not lock.locked() and self._locks.get(key) is lock:
+                del self._locks[key]
+
+
+def _scan_failed(result: dict) -> bool:
+    lookups = (result.get("domain_age"), result.get("ssl_certificate"), result.get("safe_browsing"))
+    return any(isinstance(lookup, dict) and lookup.get("error") for lookup in lookups)
+
+
+def _redirect_chain_failed(result: dict) -> bool:
+    return any(hop.get("error") for hop in result.get("chain", []))
+
+
+_scan_cache = AsyncTTLCache(is_failure=_scan_failed)
+_redirect_cache = AsyncTTLCache(is_failure=_redirect_chain_failed)
+
+
+async def cached_scan_url(url: str) -> dict:
+    return await _scan_cache.get_or_compute(normalize_url_key(url), lambda: scan_url_service(url))
+
+
+async def cached_redirect_chain(url: str) -> dict:
+    return await _redirect_cache.get_or_compute(normalize_url_key(url), lambda: get_redirect_chain(url))
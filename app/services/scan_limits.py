@@ -0,0 +1,8 @@
+"""
+Limits shared by the HTML analyzers.
+"""
+
+# Phishing signals sit near the top of the page; don't scan multi-MB
+# documents. ai_risk_analyzer caps the raw response bytes with it,
+# ai_phishing_analyzer the decoded text.
+MAX_SCAN_SIZE = 256 * 1024
@@ -1,8 +1,43 @@
 from playwright.async_api import async_playwright
+import asyncio
+import base64
 import logging
 
 logger = logging.getLogger(__name__)
 
+# One Chromium for the whole process, launched on first use; launching a
+# browser costs far more than opening a context in a running one.
+_playwright = None
+_browser = None
+_browser_lock = asyncio.Lock()
+
+
+async def _get_browser():
+    global _playwright, _browser
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            if _playwright is None:
+                _playwright = await async_playwright().start()
+            _browser = await _playwright.chromium.launch(
+                headless=True,
+                args=["--disable-dev-shm-usage"],
+            )
+        return _browser
+
+
+async def shutdown_browser() -> None:
+    """
+    Close the shared browser and stop Playwright; call on app shutdown.
+    """
+    global _playwright, _browser
+    async with _browser_lock:
+        if _browser is not None:
+            await _browser.close()
+            _browser = None
+        if _playwright is not None:
+            await _playwright.stop()
+            _playwright = None
+
 
 async def capture_screenshot(url: str) -> bytes:
     """
@@ -14,40 +49,47 @@ async def capture_screenshot(url: str) -> bytes:
     Returns:
         bytes: PNG screenshot data
     """
+    return base64.b64decode(await capture_screenshot_base64(url))
+
+
+async def capture_screenshot_base64(url: str) -> str:
+    """
+    Like capture_screenshot, but returns the PNG base64-encoded, which is
+    the form Chromium produces it in and the form the API responses need.
+    """
     # Ensure URL has a protocol
     if not url.startswith(("http://", "https://")):
         url = "http://" + url
     
     try:
-        async with async_playwright() as p:
-            # Launch browser in headless mode
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            
-            # Set viewport size
-            await page.set_viewport_size({"width": 1280, "height": 720})
-            
-            try:
-                # Navigate to the URL with a timeout
-                await page.goto(url, timeout=10000, wait_until="domcontentloaded")
-                
-                # Wait a bit for content to load
-                await page.wait_for_timeout(1000)
-                
-                # Take screenshot
-                screenshot_bytes = await page.screenshot(type="png")
-                
-                # Close browser
-                await browser.close()
-                
-                return screenshot_bytes
-                
-            except Exception as e:
-                # Close browser even if there was an error
-                await browser.close()
-                logger.error(f"Error capturing screenshot for {url}: {str(e)}")
-                raise e
-                
+        browser = await _get_browser()
+        # A fresh context per capture keeps cookies/storage isolated
+        context = await browser.new_context(viewport={"width": 1280, "height": 720})
     except Exception as e:
         logger.error(f"Error initializing Playwright for {url}: {str(e)}")
-        raise e
\ No newline at end of file
+        raise e
+
+    try:
+        page = await context.new_page()
+
+        # Navigate to the URL with a timeout
+        await page.goto(url, timeout=10000, wait_until="domcontentloaded")
+
+        # Give late content a short chance to settle; pages that keep
+        # polling never go idle, so this is capped rather than required
+        try:
+            await page.wait_for_load_state("networkidle", timeout=2000)
+        except Exception:
+            pass
+
+        # Take screenshot straight over CDP: Chromium already returns it
+        # base64-encoded, so there is no decode/re-encode round trip
+        cdp = await context.new_cdp_session(page)
+        shot = await cdp.send("Page.captureScreenshot", {"format": "png", "captureBeyondViewport": False})
+        return shot["data"]
+
+    except Exception as e:
+        logger.error(f"Error capturing screenshot for {url}: {str(e)}")
+        raise e
+    finally:
+        await context.close()
\ No newline at end of file
@@ -0,0 +1,11 @@
+"""
+Process-wide SSL context for certificate checks.
+
+Creating a default context loads and parses the system CA bundle. The
+certificate lookups in domain_ssl_service, domain_utils and url_extra_checks
+all verify against the same defaults, so they share this one context.
+"""
+
+import ssl
+
+SSL_CONTEXT = ssl.create_default_context()
@@ -44,6 +44,21 @@ class TestAiPhishAnalyzer(unittest.TestCase):
         # Test dissimilar domains
         self.assertFalse(is_lookalike("completelydifferent", ["google"]))
 
+    def test_is_lookalike_mixed_substitutions(self):
+        """Test lookalikes that swap only some of the substitutable characters."""
+        self.assertTrue(is_lookalike("g0ogle", ["google"]))
+        self.assertTrue(is_lookalike("paypa1", ["paypal", "google"]))
+
+    def test_analyze_text_brand_misspelling(self):
+        """Test a misspelled brand is flagged only when the real brand is absent."""
+        result = analyze_text("Please log in to your paypa1 account")
+
+        self.assertIn("Potential brand misspelling: 'paypa1'", result["indicators"])
+
+        result = analyze_text("Please log in to your paypal account, not paypa1")
+
+        self.assertFalse(any("brand misspelling" in ind for ind in result["indicators"]))
+
     def test_generate_variations(self):
         """Test generation of character substitution variations."""
         substitutions = {'o': ['0'], 'l': ['1']}
@@ -0,0 +1,40 @@
+import unittest
+from email_scanner_service import _scan_key
+
+
+class TestScanKey(unittest.TestCase):
+    def test_tracking_parameters_ignored(self):
+        """Test links differing only in tracking parameters share a key."""
+        base = _scan_key("https://shop.test/offer?id=7")
+
+        self.assertEqual(_scan_key("https://shop.test/offer?utm_source=mail&id=7&utm_campaign=x"), base)
+        self.assertEqual(_scan_key("https://shop.test/offer?id=7&fbclid=abc&gclid=def"), base)
+        self.assertEqual(_scan_key("https://shop.test/offer?UTM_Medium=e&id=7"), base)
+
+    def test_fragment_and_host_case_ignored(self):
+        """Test the fragment and scheme/host case don't split links."""
+        self.assertEqual(_scan_key("https://Shop.TEST/offer?id=7#details"), _scan_key("https://shop.test/offer?id=7"))
+
+    def test_redirector_targets_kept_apart(self):
+        """Test redirector links with different targets are scanned separately."""
+        evil = _scan_key("https://www.google.com/url?q=https://evil.test/login")
+        benign = _scan_key("https://www.google.com/url?q=https://example.com/")
+
+        self.assertNotEqual(evil, benign)
+
+    def test_other_parameters_kept(self):
+        """Test non-tracking parameters and the path are part of the key."""
+        self.assertNotEqual(_scan_key("https://shop.test/offer?id=7"), _scan_key("https://shop.test/offer?id=8"))
+        self.assertNotEqual(_scan_key("https://shop.test/offer"), _scan_key("https://shop.test/Offer"))
+
+    def test_default_scheme(self):
+        """Test a link without scheme gets the same default as the scanner."""
+        self.assertEqual(_scan_key("shop.test/offer"), _scan_key("http://shop.test/offer"))
+
+    def test_malformed_url(self):
+        """Test a URL urlsplit rejects still gets a key of its own."""
+        self.assertEqual(_scan_key("http://[bad/x"), ("", "", "http://[bad/x", ()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import json
+import unittest
+
+import httpx
+
+from app.config import settings
+from app.services import http_client
+import gsb_service
+from gsb_service import check_google_safe_browsing, check_google_safe_browsing_batch
+
+EVIL = "http://evil.test/login"
+GOOD = "http://good.test/"
+
+
+class TestGsbService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._api_key = settings.google_safe_browsing_api_key
+        settings.google_safe_browsing_api_key = "test-key"
+        gsb_service._VERDICT_CACHE.clear()
+        self.requests = []
+        self.status = 200
+        http_client._client = httpx.AsyncClient(transport=httpx.MockTransport(self._handle))
+
+    async def asyncTearDown(self):
+        settings.google_safe_browsing_api_key = self._api_key
+        gsb_service._VERDICT_CACHE.clear()
+        await http_client.close_client()
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        entries = json.loads(request.content)["threatInfo"]["threatEntries"]
+        self.requests.append([entry["url"] for entry in entries])
+        if self.status != 200:
+            return httpx.Response(self.status, json={"error": {"code": self.status}})
+        matches = [
+            {"threatType": "SOCIAL_ENGINEERING", "threat": {"url": entry["url"]}}
+            for entry in entries if "evil" in entry["url"]
+        ]
+        return httpx.Response(200, json={"matches": matches} if matches else {})
+
+    async def test_batch_single_request(self):
+        """Test a batch is checked with one deduplicated request."""
+        results = await check_google_safe_browsing_batch([EVIL, GOOD, EVIL])
+
+        self.assertEqual(self.requests, [[EVIL, GOOD]])
+        self.assertTrue(results[EVIL]["flagged"])
+        self.assertEqual(len(results[EVIL]["details"]["matches"]), 1)
+        self.assertEqual(results[GOOD], {"flagged": False, "details": {}})
+
+    async def test_verdicts_cached(self):
+        """Test verdicts from a batch answer later single checks without a request."""
+        await check_google_safe_browsing_batch([EVIL, GOOD])
+        self.assertTrue((await check_google_safe_browsing(EVIL))["flagged"])
+        self.assertFalse((await check_google_safe_browsing(GOOD))["flagged"])
+
+        self.assertEqual(len(self.requests), 1)
+
+    async def test_only_uncached_urls_requested(self):
+        """Test a batch only asks for URLs not already cached."""
+        await check_google_safe_browsing(EVIL)
+        await check_google_safe_browsing_batch([EVIL, GOOD])
+
+        self.assertEqual(self.requests, [[EVIL], [GOOD]])
+
+    async def test_errors_not_cached(self):
+        """Test failed lookups are marked and retried on the next check."""
+        self.status = 503
+        result = await check_google_safe_browsing(EVIL)
+
+        self.assertFalse(result["flagged"])
+        self.assertIn("error", result)
+
+        self.status = 200
+        self.assertTrue((await check_google_safe_browsing(EVIL))["flagged"])
+        self.assertEqual(len(self.requests), 2)
+
+    async def test_no_api_key(self):
+        """Test without an API key nothing is flagged and nothing is requested."""
+        settings.google_safe_browsing_api_key = None
+
+        self.assertEqual(await check_google_safe_browsing(EVIL), {"flagged": False, "details": {}})
+        self.assertEqual(self.requests, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
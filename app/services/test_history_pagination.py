@@ -0,0 +1,89 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, get_db
+from app.models import ScanHistory
+from app.routers.history import router
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class TestHistoryPagination(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # One shared in-memory database for the whole test
+        self.engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+
+        async with sessions() as db:
+            for i in range(5):
+                db.add(ScanHistory(
+                    user_id="alice", scan_type="url", target=f"http://a{i}.test",
+                    result={"i": i}, risk_score=i, risk_label="safe",
+                    created_at=START + timedelta(minutes=i),
+                ))
+            db.add(ScanHistory(
+                user_id="bob", scan_type="url", target="http://b.test",
+                result={}, risk_score=0, risk_label="safe",
+                created_at=START + timedelta(minutes=10),
+            ))
+            await db.commit()
+
+        async def override_get_db():
+            async with sessions() as db:
+                yield db
+
+        app = FastAPI()
+        app.include_router(router)
+        app.dependency_overrides[get_db] = override_get_db
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        await self.engine.dispose()
+
+    async def test_newest_first_with_limit(self):
+        """Test history is newest first and capped at limit."""
+        resp = await self.client.get("/history/alice", params={"limit": 2})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([row["target"] for row in resp.json()], ["http://a4.test", "http://a3.test"])
+
+    async def test_before_cursor_continues_page(self):
+        """Test the created_at cursor returns the next page without overlap."""
+        first = (await self.client.get("/history/alice", params={"limit": 2})).json()
+        cursor = first[-1]["created_at"]
+
+        second = (await self.client.get("/history/alice", params={"limit": 2, "before": cursor})).json()
+        third = (await self.client.get("/history/alice", params={"limit": 2, "before": second[-1]["created_at"]})).json()
+
+        self.assertEqual([row["target"] for row in second], ["http://a2.test", "http://a1.test"])
+        self.assertEqual([row["target"] for row in third], ["http://a0.test"])
+
+    async def test_only_the_users_scans(self):
+        """Test another user's scans are never listed."""
+        rows = (await self.client.get("/history/alice")).json()
+
+        self.assertEqual(len(rows), 5)
+        self.assertNotIn("http://b.test", [row["target"] for row in rows])
+
+    async def test_summary_omits_result(self):
+        """Test list rows don't carry the full result blob."""
+        rows = (await self.client.get("/history/alice", params={"limit": 1})).json()
+
+        self.assertNotIn("result", rows[0])
+
+    async def test_limit_bounds(self):
+        """Test limit outside 1..200 is rejected."""
+        self.assertEqual((await self.client.get("/history/alice", params={"limit": 0})).status_code, 422)
+        self.assertEqual((await self.client.get("/history/alice", params={"limit": 201})).status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from keyword_matcher import KeywordMatcher
+
+
+class TestKeywordMatcher(unittest.TestCase):
+    def test_find_declaration_order(self):
+        """Test phrases are reported in declaration order, not text order."""
+        matcher = KeywordMatcher({"a": ["verify", "login", "Account"], "b": ["bank"]})
+        found = matcher.find("bank login for my account, verify now")
+
+        self.assertEqual(found["a"], ["verify", "login", "Account"])
+        self.assertEqual(found["b"], ["bank"])
+
+    def test_find_missing_category(self):
+        """Test categories without hits are present and empty."""
+        matcher = KeywordMatcher({"a": ["verify"], "b": ["bank"]})
+
+        self.assertEqual(matcher.find("please verify"), {"a": ["verify"], "b": []})
+
+    def test_hits_lowercased(self):
+        """Test hits are the lowercased phrases found in the text."""
+        matcher = KeywordMatcher({"a": ["Action Required"]})
+
+        self.assertEqual(matcher.hits("urgent: action required"), {"action required"})
+
+    def test_nul_separator_boundary(self):
+        """Test a phrase is not matched across a NUL separator."""
+        matcher = KeywordMatcher({"a": ["login"]})
+
+        self.assertEqual(matcher.hits("/x/log\0in.example.com"), set())
+        self.assertEqual(matcher.hits("/x/login\0example.com"), {"login"})
+
+    def test_empty_matcher(self):
+        """Test a matcher without phrases finds nothing."""
+        matcher = KeywordMatcher({"a": []})
+
+        self.assertEqual(matcher.hits("anything"), set())
+        self.assertEqual(matcher.find("anything"), {"a": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
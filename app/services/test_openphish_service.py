@@ -0,0 +1,85 @@
+import unittest
+from array import array
+
+import httpx
+
+from app.services import http_client
+from openphish_service import OpenPhish, normalize_feed_url, _url_hash
+
+FEED = "\n".join([
+    "https://Evil.Example.com/login/",
+    "http://[bad/x",
+    "",
+    "http://phish.test/verify?id=1#top",
+])
+
+
+class TestNormalizeFeedUrl(unittest.TestCase):
+    def test_normalization(self):
+        """Test scheme/host case, trailing slash and fragment are normalized away."""
+        self.assertEqual(normalize_feed_url(" HTTPS://Evil.Example.com/login/ "), "https://evil.example.com/login")
+        self.assertEqual(normalize_feed_url("http://phish.test/verify?id=1#top"), "http://phish.test/verify?id=1")
+
+    def test_path_and_query_case_preserved(self):
+        """Test path and query are not lowercased."""
+        self.assertEqual(normalize_feed_url("http://a.test/Login?Id=1"), "http://a.test/Login?Id=1")
+
+    def test_hash_is_64_bit_and_stable(self):
+        """Test feed hashes fit the unsigned 64-bit array and are deterministic."""
+        h = _url_hash("https://evil.example.com/login")
+
+        self.assertEqual(h, _url_hash("https://evil.example.com/login"))
+        self.assertLess(h, 2 ** 64)
+        array("Q", [h])
+
+
+class TestOpenPhish(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, text=FEED))
+        http_client._client = httpx.AsyncClient(transport=transport)
+
+    async def asyncTearDown(self):
+        await http_client.close_client()
+
+    async def test_load_feed_skips_malformed_lines(self):
+        """Test one malformed feed line doesn't discard the rest of the feed."""
+        feed = OpenPhish()
+        await feed.load_feed()
+
+        self.assertEqual(len(feed.hashes), 2)
+        self.assertEqual(list(feed.hashes), sorted(feed.hashes))
+
+    async def test_is_phishing_matches_variants(self):
+        """Test trivial variants of a listed URL match, others don't."""
+        feed = OpenPhish()
+        await feed.load_feed()
+
+        self.assertTrue(feed.is_phishing("https://evil.example.com/login"))
+        self.assertTrue(feed.is_phishing("HTTPS://EVIL.example.com/login/#x"))
+        self.assertTrue(feed.is_phishing("http://phish.test/verify?id=1"))
+        self.assertFalse(feed.is_phishing("http://phish.test/verify?id=2"))
+        self.assertFalse(feed.is_phishing("https://example.com/"))
+
+    async def test_is_phishing_malformed_url(self):
+        """Test a malformed URL is reported as not listed instead of raising."""
+        feed = OpenPhish()
+        await feed.load_feed()
+
+        self.assertFalse(feed.is_phishing("http://[bad/x"))
+
+    async def test_failed_load_keeps_previous_feed(self):
+        """Test a failed reload keeps serving the previous feed."""
+        feed = OpenPhish()
+        await feed.load_feed()
+        await http_client.close_client()
+        http_client._client = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(503))
+        )
+
+        await feed.load_feed()
+
+        self.assertEqual(len(feed.hashes), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
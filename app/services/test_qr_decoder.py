@@ -0,0 +1,107 @@
+import unittest
+
+import cv2
+import numpy as np
+
+import qr_decoder
+from qr_decoder import decode_qr_image
+
+PAYLOAD = "https://example.com/qr"
+
+
+def _qr(module_px: int) -> np.ndarray:
+    code = cv2.QRCodeEncoder.create().encode(PAYLOAD)
+    return cv2.resize(code, None, fx=module_px, fy=module_px, interpolation=cv2.INTER_NEAREST)
+
+
+def _png(img: np.ndarray) -> bytes:
+    ok, buf = cv2.imencode(".png", img)
+    return buf.tobytes()
+
+
+def _busy_photo(h: int = 1500, w: int = 2000) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    img = np.zeros((h, w), np.uint8)
+    for _ in range(300):
+        x, y = (int(v) for v in rng.integers(0, w, 2))
+        cv2.circle(img, (x, y % h), int(rng.integers(5, 100)), int(rng.integers(0, 255)), -1)
+    return img
+
+
+def _on_canvas(code: np.ndarray, canvas: np.ndarray, at: int = 200) -> np.ndarray:
+    img = canvas.copy()
+    quiet = 4 * (code.shape[0] // 25)
+    img[at - quiet:at + code.shape[0] + quiet, at - quiet:at + code.shape[1] + quiet] = 255
+    img[at:at + code.shape[0], at:at + code.shape[1]] = code
+    return img
+
+
+class TestQrDecoder(unittest.TestCase):
+    def setUp(self):
+        self.opencv_calls = []
+        self._detector = qr_decoder._detector
+        self._pyzbar = qr_decoder.pyzbar_decode
+        qr_decoder._detector = self._counting_detector
+
+    def tearDown(self):
+        qr_decoder._detector = self._detector
+        qr_decoder.pyzbar_decode = self._pyzbar
+
+    def _counting_detector(self):
+        detector = self._detector()
+        calls = self.opencv_calls
+
+        class Counting:
+            def detectAndDecode(self, img):
+                calls.append(img.shape)
+                return detector.detectAndDecode(img)
+
+        return Counting()
+
+    def test_small_image_decoded_directly(self):
+        """Test images at or below preview size are decoded as is."""
+        img = _on_canvas(_qr(8), np.full((360, 360), 255, np.uint8), at=40)
+
+        self.assertEqual(decode_qr_image(_png(img)), PAYLOAD)
+        self.assertEqual(self.opencv_calls, [img.shape])
+
+    def test_large_code_decoded_from_preview(self):
+        """Test a large code in a big image decodes from the preview alone."""
+        img = _on_canvas(_qr(40), np.full((2000, 2000), 255, np.uint8))
+
+        self.assertEqual(decode_qr_image(_png(img)), PAYLOAD)
+        self.assertEqual(len(self.opencv_calls), 1)
+        self.assertLessEqual(max(self.opencv_calls[0]), qr_decoder.PREVIEW_SIZE)
+
+    def test_flat_image_rejected_without_decoding(self):
+        """Test an image without edges is rejected before any decoder runs."""
+        img = np.full((2000, 2000), 128, np.uint8)
+
+        self.assertIsNone(decode_qr_image(_png(img)))
+        self.assertEqual(self.opencv_calls, [])
+
+    def test_busy_photo_without_code_with_pyzbar(self):
+        """Test a busy photo without a code costs the preview plus one pyzbar pass."""
+        pyzbar_calls = []
+        qr_decoder.pyzbar_decode = lambda img: pyzbar_calls.append(img.shape) or []
+        img = _busy_photo()
+
+        self.assertIsNone(decode_qr_image(_png(img)))
+        self.assertEqual(len(self.opencv_calls), 1)
+        self.assertEqual(pyzbar_calls, [img.shape])
+
+    def test_small_code_found_at_full_resolution_without_pyzbar(self):
+        """Test without pyzbar a code too small for the preview is found at full resolution."""
+        qr_decoder.pyzbar_decode = None
+        img = _on_canvas(_qr(6), _busy_photo())
+
+        self.assertEqual(decode_qr_image(_png(img)), PAYLOAD)
+        self.assertEqual(self.opencv_calls[-1], img.shape)
+
+    def test_invalid_bytes(self):
+        """Test bytes that are not an image return None."""
+        self.assertIsNone(decode_qr_image(b"not an image"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+from rule_based_service import check_rule_based
+
+
+class TestRuleBasedService(unittest.TestCase):
+    def test_trusted_domain_subdomain(self):
+        """Test subdomains of a trusted domain get the trusted discount."""
+        result = check_rule_based("https://mail.google.com/login")
+
+        self.assertTrue(result["details"].get("trusted_domain"))
+
+    def test_trusted_domain_lookalike_host(self):
+        """Test hosts that merely contain a trusted name are not trusted."""
+        result = check_rule_based("https://evil-google.com.attacker.net/login")
+
+        self.assertNotIn("trusted_domain", result["details"])
+        self.assertGreater(result["score"], check_rule_based("https://mail.google.com/login")["score"])
+
+    def test_mixed_case_domain(self):
+        """Test uppercase in the netloc is flagged, but not in the path."""
+        mixed = "Mixed case in domain (possible spoofing)"
+
+        self.assertIn(mixed, check_rule_based("https://PayPal-Secure.com/")["reasons"])
+        self.assertNotIn(mixed, check_rule_based("https://example.com/")["reasons"])
+        self.assertNotIn(mixed, check_rule_based("https://example.com/Login")["reasons"])
+
+    def test_keyword_not_matched_across_path_and_domain(self):
+        """Test a keyword split between the path end and domain start is not found."""
+        result = check_rule_based("https://in.example.com/x/log")
+
+        self.assertFalse(any("Suspicious keyword detected" in r for r in result["reasons"]))
+        self.assertIn(
+            "Suspicious keyword detected: 'login'",
+            check_rule_based("https://example.com/x/login")["reasons"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+from scan_cache import AsyncTTLCache, normalize_url_key, _redirect_chain_failed, _scan_failed
+
+
+class TestNormalizeUrlKey(unittest.TestCase):
+    def test_scheme_default_and_host_case(self):
+        """Test the default scheme is added and scheme/host are lowercased."""
+        self.assertEqual(normalize_url_key(" Example.COM/Path?Q=1 "), "http://example.com/Path?Q=1")
+        self.assertEqual(normalize_url_key("https://EXAMPLE.com/A"), "https://example.com/A")
+
+    def test_path_and_query_case_preserved(self):
+        """Test path and query stay case-sensitive."""
+        self.assertNotEqual(normalize_url_key("https://example.com/A"), normalize_url_key("https://example.com/a"))
+
+
+class TestFailureChecks(unittest.TestCase):
+    def test_scan_failed(self):
+        """Test a scan is a failure when any lookup reports an error."""
+        ok = {"domain_age": {"age_days": 10}, "ssl_certificate": {"valid": True}, "safe_browsing": {"flagged": False}}
+
+        self.assertFalse(_scan_failed(ok))
+        self.assertFalse(_scan_failed({"label": "invalid", "reasons": []}))
+        self.assertTrue(_scan_failed({**ok, "safe_browsing": {"flagged": False, "error": "timeout"}}))
+        self.assertTrue(_scan_failed({**ok, "ssl_certificate": {"valid": False, "error": "refused"}}))
+
+    def test_redirect_chain_failed(self):
+        """Test a redirect chain is a failure when any hop has an error."""
+        self.assertFalse(_redirect_chain_failed({"chain": [{"url": "http://a", "status": 200}]}))
+        self.assertTrue(_redirect_chain_failed({"chain": [{"url": "http://a", "status": 408, "error": "Timeout"}]}))
+
+
+class TestAsyncTTLCache(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_requests_share_one_call(self):
+        """Test concurrent requests for one key run compute once."""
+        cache = AsyncTTLCache()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"value": calls}
+
+        results = await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+
+        self.assertEqual(calls, 1)
+        self.assertEqual(results, [{"value": 1}] * 5)
+        self.assertEqual(cache._locks, {})
+
+    async def test_entries_expire(self):
+        """Test an entry is recomputed after its TTL."""
+        cache = AsyncTTLCache(ttl=0.05)
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            return {"value": calls}
+
+        await cache.get_or_compute("k", compute)
+        await cache.get_or_compute("k", compute)
+        self.assertEqual(calls, 1)
+
+        await asyncio.sleep(0.1)
+        self.assertEqual(await cache.get_or_compute("k", compute), {"value": 2})
+
+    async def test_failures_use_short_ttl(self):
+        """Test failed results expire after failure_ttl, not ttl."""
+        cache = AsyncTTLCache(ttl=60, failure_ttl=0.05, is_failure=lambda value: "error" in value)
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            return {"error": "timeout"}
+
+        await cache.get_or_compute("k", compute)
+        await cache.get_or_compute("k", compute)
+        self.assertEqual(calls, 1)
+
+        await asyncio.sleep(0.1)
+        await cache.get_or_compute("k", compute)
+        self.assertEqual(calls, 2)
+
+    async def test_callers_get_copies(self):
+        """Test mutating a returned result does not change the cached one."""
+        cache = AsyncTTLCache()
+
+        async def compute():
+            return {"reasons": ["a"]}
+
+        first = await cache.get_or_compute("k", compute)
+        first["reasons"].append("b")
+
+        self.assertEqual(await cache.get_or_compute("k", compute), {"reasons": ["a"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
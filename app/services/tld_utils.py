@@ -0,0 +1,32 @@
+"""
+Shared, cached tldextract access.
+
+The module-level `tldextract.extract` may try to refresh the public suffix
+list over the network and re-parses every URL it is given. This extractor
+only uses the suffix list snapshot bundled with tldextract, and results are
+memoised so the same URL is never parsed twice.
+"""
+
+from functools import lru_cache
+
+import tldextract
+from tldextract.tldextract import ExtractResult
+
+# No suffix_list_urls -> never fetches over the network (not even at import);
+# cache_dir=None -> no disk cache, the bundled snapshot is loaded once.
+_EXTRACTOR = tldextract.TLDExtract(suffix_list_urls=(), cache_dir=None)
+
+
+@lru_cache(maxsize=4096)
+def extract(url: str) -> ExtractResult:
+    """
+    Drop-in replacement for `tldextract.extract(url)`.
+    """
+    return _EXTRACTOR(url)
+
+
+def warm_up() -> None:
+    """
+    Load the bundled suffix list now instead of on the first request.
+    """
+    _EXTRACTOR("example.com")
@@ -2,15 +2,16 @@ import socket
 import ssl
 from datetime import datetime, timezone
 
-import tldextract
-import whois
+from app.services.domain_ssl_service import whois_cached
+from app.services.ssl_context import SSL_CONTEXT
+from app.services.tld_utils import extract as extract_tld
 
 
 def get_domain_and_host(url: str):
     """
     Extract the registrable domain and host from a URL.
     """
-    ext = tldextract.extract(url)
+    ext = extract_tld(url)
     domain = f"{ext.domain}.{ext.suffix}" if ext.suffix else ext.domain
     host = domain
     return domain, host
@@ -22,7 +23,8 @@ def get_domain_age_days(url: str) -> dict:
     """
     domain, _ = get_domain_and_host(url)
     try:
-        w = whois.whois(domain)
+        # Day-long WHOIS cache shared with the other domain-age lookups
+        w = whois_cached(domain)
         created = w.creation_date
 
         # whois returns either single datetime or list; normalize
@@ -64,34 +66,77 @@ def get_ssl_info(url: str, timeout: int = 8) -> dict:
     port = 443
 
     try:
-        ctx = ssl.create_default_context()
         with socket.create_connection((host, port), timeout=timeout) as sock:
-            with ctx.wrap_socket(sock, server_hostname=host) as ssock:
-                cert_bin = ssock.getpeercert(binary_form=True)
-
-        from cryptography import x509
-
-        cert = x509.load_der_x509_certificate(cert_bin)
-        issuer = cert.issuer.rfc4514_string()
-        subject = cert.subject.rfc4514_string()
-        not_before = cert.not_valid_before
-        not_after = cert.not_valid_after
-
-        return {
-            "issuer": issuer,
-            "subject": subject,
-            "valid_from": not_before.isoformat(),
-            "valid_to": not_after.isoformat(),
-            "error": None,
-        }
+            with SSL_CONTEXT.wrap_socket(sock, server_hostname=host) as ssock:
+                # Already parsed by the ssl module during the handshake
+                cert = ssock.getpeercert()
+        return _certificate_details(cert)
     except Exception as e:
-        return {
-            "issuer": None,
-            "subject": None,
-            "valid_from": None,
-            "valid_to": None,
-            "error": str(e),
-        }
-
+        return _certificate_error(e)
 
 
+def _certificate_details(cert: dict) -> dict:
+    """
+    Summarise a certificate in the dict form returned by getpeercert().
+    """
+    return {
+        "issuer": _rfc4514_string(cert.get("issuer", ())),
+        "subject": _rfc4514_string(cert.get("subject", ())),
+        "valid_from": _cert_time_isoformat(cert["notBefore"]),
+        "valid_to": _cert_time_isoformat(cert["notAfter"]),
+        "error": None,
+    }
+
+
+# getpeercert() attribute names -> RFC 4514 short names
+_RFC4514_NAMES = {
+    "commonName": "CN",
+    "localityName": "L",
+    "stateOrProvinceName": "ST",
+    "organizationName": "O",
+    "organizationalUnitName": "OU",
+    "countryName": "C",
+    "streetAddress": "STREET",
+    "domainComponent": "DC",
+    "userId": "UID",
+}
+
+
+def _rfc4514_string(name) -> str:
+    """
+    Format a getpeercert() distinguished name, a sequence of RDNs of
+    (attribute, value) pairs, as an RFC 4514 string (last RDN first).
+    """
+    return ",".join(
+        "+".join(f"{_RFC4514_NAMES.get(attr, attr)}={_rfc4514_escape(value)}" for attr, value in rdn)
+        for rdn in reversed(name)
+    )
+
+
+def _rfc4514_escape(value: str) -> str:
+    last = len(value) - 1
+    escaped = []
+    for i, c in enumerate(value):
+        if c in '\\"+,;<>' or (i == 0 and c in "# ") or (i == last and c == " "):
+            escaped.append("\\" + c)
+        elif c == "\0":
+            escaped.append("\\00")
+        else:
+            escaped.append(c)
+    return "".join(escaped)
+
+
+def _cert_time_isoformat(cert_time: str) -> str:
+    # notBefore/notAfter are GMT; keep the naive-UTC isoformat used so far
+    seconds = ssl.cert_time_to_seconds(cert_time)
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def _certificate_error(e) -> dict:
+    return {
+        "issuer": None,
+        "subject": None,
+        "valid_from": None,
+        "valid_to": None,
+        "error": str(e),
+    }
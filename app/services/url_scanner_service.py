@@ -1,22 +1,26 @@
+import asyncio
 from datetime import datetime, timezone
 
-import httpx
-import tldextract
 import validators
 
 # Updated import to use the new AI phishing analyzer
 from app.services.ai_phish_analyzer import analyze_page
 from app.services.gsb_service import check_google_safe_browsing
 from app.services.openphish_service import openphish
-from app.services.domain_utils import get_domain_age, get_ssl_certificate
+from app.services.domain_utils import get_domain_age, get_ssl_certificate_async
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.tld_utils import extract as extract_tld
+
+
+PHISHING_URL_KEYWORDS = ["login", "verify", "update", "secure", "account"]
+PHISHING_URL_KEYWORD_MATCHER = KeywordMatcher({"keyword": PHISHING_URL_KEYWORDS})
+
+# Indexed by how many of the two thresholds (30, 60) the score reaches
+_LABELS = ("safe", "suspicious", "phishing")
 
 
 def _label_from_score(score: int) -> str:
-    if score >= 60:
-        return "phishing"
-    if score >= 30:
-        return "suspicious"
-    return "safe"
+    return _LABELS[(score >= 30) + (score >= 60)]
 
 
 async def scan_url_service(url: str) -> dict:
@@ -37,12 +41,17 @@ async def scan_url_service(url: str) -> dict:
         }
 
     # Extract domain
-    extracted = tldextract.extract(url)
+    extracted = extract_tld(url)
     main_domain = f"{extracted.domain}.{extracted.suffix}"
 
-    # Get domain age and SSL certificate info
-    domain_age = get_domain_age(main_domain)
-    ssl_info = get_ssl_certificate(main_domain)
+    # Domain age, SSL certificate and Safe Browsing lookups are independent
+    # network calls, so run them concurrently; WHOIS is blocking, so it
+    # runs in a worker thread
+    domain_age, ssl_info, gsb = await asyncio.gather(
+        asyncio.to_thread(get_domain_age, main_domain),
+        get_ssl_certificate_async(main_domain),
+        check_google_safe_browsing(url),
+    )
 
     # Domain age check
     if isinstance(domain_age.get("age_days"), int) and domain_age["age_days"] < 30:
@@ -83,7 +92,6 @@ async def scan_url_service(url: str) -> dict:
     # ----------------------------
     # 1. Google Safe Browsing check
     # ----------------------------
-    gsb = await check_google_safe_browsing(url)
     gsb_score = 60 if gsb["flagged"] else 0
     if gsb["flagged"]:
         score += 60
@@ -116,8 +124,7 @@ async def scan_url_service(url: str) -> dict:
         reasons.append("Contains many special characters")
 
     # Fake login pages
-    suspicious_keywords = ["login", "verify", "update", "secure", "account"]
-    if any(word in url.lower() for word in suspicious_keywords):
+    if PHISHING_URL_KEYWORD_MATCHER.hits(url.lower()):
         score += 10
         reasons.append("Contains phishing-related keywords")
 
@@ -131,4 +138,5 @@ async def scan_url_service(url: str) -> dict:
         "reasons": reasons,
         "domain_age": domain_age,
         "ssl_certificate": ssl_info,
+        "safe_browsing": gsb,
     }
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""scan_history.result as JSONB with a GIN index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15 18:05:12.403118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # JSONB and GIN only exist on Postgres; other backends keep plain JSON.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.alter_column(
+        'scan_history',
+        'result',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        postgresql_using='result::jsonb',
+    )
+    op.create_index(
+        'ix_scan_history_result_gin',
+        'scan_history',
+        ['result'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_scan_history_result_gin', table_name='scan_history')
+    op.alter_column(
+        'scan_history',
+        'result',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        postgresql_using='result::json',
+    )